@@ -0,0 +1,79 @@
+import numpy as np
+
+
+def allocate_shots(weights, ntotal, minimum=1):
+    """
+    Split ntotal shots into integers proportional to weights (largest remainder method).
+
+    :param weights: non-negative weights for each item
+    :param ntotal: total number of shots
+    :param minimum: number of shots every item receives first
+    :return integer array whose sum is ntotal:
+    """
+    weights = np.abs(np.asarray(weights, dtype=float))
+    ntotal = int(ntotal)
+    if ntotal < minimum * len(weights):
+        # an item without shots would silently contribute nothing to the estimate
+        raise ValueError(f'{ntotal} shots are fewer than {minimum} for each of {len(weights)} items.')
+    if len(weights) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if np.sum(weights) == 0:
+        weights = np.ones(len(weights))
+    base = np.full(len(weights), minimum, dtype=np.int64)
+    rest = ntotal - int(np.sum(base))
+    quotas = rest * weights / np.sum(weights)
+    shots = np.floor(quotas).astype(np.int64)
+    remainder = rest - int(np.sum(shots))
+    if remainder > 0:
+        shots[np.argsort(shots - quotas, kind="stable")[:remainder]] += 1
+    return base + shots
+
+
+class ShotAllocator:
+    def weights(self, hs, variances=None):
+        return np.ones(len(hs))
+
+    def allocate(self, hs, ntotal, variances=None, minimum=1):
+        """
+        :param hs: coefficients of the terms
+        :param ntotal: total number of shots
+        :param variances: estimated variances of the terms (used by the variance-aware allocators)
+        :param minimum: number of shots every term receives at least (ValueError if ntotal is too small)
+        :return integer array of the number of shots for each term:
+        """
+        return allocate_shots(self.weights(hs, variances), ntotal, minimum)
+
+
+class UniformAllocator(ShotAllocator):
+    pass
+
+
+class ProportionalAllocator(ShotAllocator):
+    def weights(self, hs, variances=None):
+        return np.abs(np.asarray(hs, dtype=float))
+
+
+class NeymanAllocator(ShotAllocator):
+    """
+    Weighted-variance optimal allocation: n_k is proportional to |h_k| sigma_k,
+    which minimizes the variance of sum_k h_k <P_k> for the fixed total shots.
+    """
+
+    def weights(self, hs, variances=None):
+        weights = np.abs(np.asarray(hs, dtype=float))
+        if variances is None:
+            return weights
+        return weights * np.sqrt(np.clip(variances, 0, None))
+
+
+def split_rounds(ntotal, rounds, nitems):
+    """
+    Split ntotal shots into rounds so that the first round can give every item a shot.
+
+    :return integer array of the number of shots of each round:
+    """
+    if ntotal < nitems:
+        raise ValueError(f'{ntotal} shots are fewer than the {nitems} items to be measured.')
+    shots = allocate_shots(np.ones(rounds), ntotal - nitems, minimum=0)
+    shots[0] += nitems
+    return shots
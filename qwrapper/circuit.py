@@ -3,12 +3,20 @@ from qiskit_aer import Aer
 from qiskit.providers.basic_provider import BasicSimulator
 from qiskit.primitives import StatevectorSampler as Sampler
 from qiskit.quantum_info import Statevector
-from qulacs import QuantumState, QuantumCircuit as QCircuit
+from qulacs import QuantumState, QuantumCircuit as QCircuit, ParametricQuantumCircuit
 from qulacs.gate import H, S, Sdag, X, Y, Z, RX, RY, RZ, CNOT, CZ, merge
+from qulacs.circuit import QuantumCircuitOptimizer
 from abc import ABC, abstractmethod
 from qwrapper.encoder import Encoder
+from qwrapper import profiler
 import random, math
 import logging
+import threading
+import itertools
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
 
 try:
     import cudaq
@@ -16,6 +24,66 @@ except ImportError:
     logging.debug("cudaq is not imported.")
 
 
+_local = threading.local()
+
+
+def seed(value):
+    """
+    Seed the sampling of the circuits executed on the current thread.
+    """
+    _local.random = random.Random(value)
+
+
+def unseed():
+    """
+    Drop the sampling seed of the current thread, so that the global random module is used again.
+    """
+    if hasattr(_local, "random"):
+        del _local.random
+
+
+def reseed(value):
+    """
+    Seed the global random module, which the sampling of the current thread follows from then on.
+    """
+    random.seed(value)
+    unseed()
+
+
+@contextmanager
+def seeded(value, seed_globals=False):
+    """
+    Seed the sampling of the current thread (and the global random and np.random if seed_globals)
+    within the block, restoring the previous states afterwards.
+    """
+    previous = getattr(_local, "random", None)
+    states = None
+    if seed_globals:
+        states = random.getstate(), np.random.get_state()
+        random.seed(value)
+        np.random.seed(value)
+    seed(value)
+    try:
+        yield
+    finally:
+        if previous is None:
+            unseed()
+        else:
+            _local.random = previous
+        if states is not None:
+            random.setstate(states[0])
+            np.random.set_state(states[1])
+
+
+def _sampling_seed():
+    return getattr(_local, "random", random).randint(0, 100000)
+
+
+def seeded_samples(qc, nshot, value):
+    with seeded(value):
+        return qc.get_samples(nshot)
+
+
 def from_bitstring(str):
     array = []
     for c in str:
@@ -23,6 +91,60 @@ def from_bitstring(str):
     return array
 
 
+class Samples:
+    """
+    Measurement outcomes kept as integers (j-th bit corresponds to j-th qubit).
+    The bit-list and bitstring forms used by get_samples and get_counts are built on demand.
+    """
+
+    def __init__(self, raw, nqubit):
+        self.raw = np.asarray(raw, dtype=np.uint64)
+        self.nqubit = nqubit
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __getitem__(self, index):
+        return from_bitstring(self._get_bin(int(self.raw[index])))
+
+    def __iter__(self):
+        dictionary = {}
+        for sample in self.raw.tolist():
+            if sample not in dictionary:
+                dictionary[sample] = from_bitstring(self._get_bin(sample))
+            yield dictionary[sample]
+
+    @profiler.timed("convert")
+    def bit_lists(self):
+        return list(iter(self))
+
+    @profiler.timed("convert")
+    def bitstrings(self):
+        values, inverse = np.unique(self.raw, return_inverse=True)
+        strings = [self._get_bin(v) for v in values.tolist()]
+        return [strings[j] for j in inverse.tolist()]
+
+    def bit_matrix(self):
+        """
+        :return (nshot x nqubit) uint8 array, whose i-th column corresponds to nqubit - i - 1-th qubit:
+        """
+        shifts = np.arange(self.nqubit - 1, -1, -1, dtype=np.uint64)
+        return ((self.raw[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+
+    @profiler.timed("convert")
+    def counts(self):
+        if self.nqubit <= 16:
+            bins = np.bincount(self.raw.astype(np.int64), minlength=1)
+            values = np.nonzero(bins)[0]
+            counts = bins[values]
+        else:
+            values, counts = np.unique(self.raw, return_counts=True)
+        return {self._get_bin(v): c for v, c in zip(values.tolist(), counts.tolist())}
+
+    def _get_bin(self, x):
+        return format(x, 'b').zfill(self.nqubit)
+
+
 class Const:
     simulator = Aer.get_backend('qasm_simulator')
     s_simulator = Aer.get_backend('statevector_simulator')
@@ -131,6 +253,9 @@ class QWrapper(ABC):
     def get_counts(self, nshot):
         pass
 
+    def get_raw_samples(self, nshot) -> Samples:
+        raise NotImplementedError('not supported.')
+
     @abstractmethod
     def post_select(self, target, index):
         pass
@@ -140,88 +265,274 @@ class QWrapper(ABC):
         pass
 
     @classmethod
-    def execute_post_selects(cls, vector, post_selects, n_qubit):
-        for index, bit in sorted(post_selects.items(), key=lambda item: item[0], reverse=True):
-            vector = cls.execute_post_select(vector, index, bit, n_qubit)
+    def execute_post_selects(cls, vector, post_selects, n_qubit, inplace=False):
+        """
+        Project the state vector onto the post-selected bits and renormalize it.
+
+        :param vector: state vector of length 2^n_qubit
+        :param post_selects: {i: bit}, where i-th bit of the bitstring (i.e. n_qubit - i - 1-th qubit) is fixed to bit
+        :param inplace: write the result into vector (must be a complex numpy array) instead of a new buffer
+        :return the post-selected state vector:
+        """
+        if len(post_selects) == 0:
+            return vector
+        if inplace:
+            vector = np.asarray(vector)
+        else:
+            vector = np.array(vector, dtype=np.complex128)
+        # axis i of the reshaped tensor corresponds to the i-th bit of the bitstring.
+        tensor = vector.reshape([2] * n_qubit)
+        for i, bit in post_selects.items():
+            index = [slice(None)] * n_qubit
+            index[i] = 1 - int(bit)
+            tensor[tuple(index)] = 0
+        norm = math.sqrt(abs(np.vdot(vector, vector)))
+        if norm == 0:
+            raise ZeroDivisionError('the post-selection has zero probability.')
+        vector /= norm
         return vector
 
     @classmethod
     def execute_post_select(cls, state_vector, i, bit, n_qubit):
-        results = []
-        encoder = Encoder(n_qubit)
-        norm = 0
-        for num, amplitude in enumerate(state_vector):
-            array = encoder.encode(num)
-            if array[i] != int(bit):
-                results.append(0)
-                continue
-            results.append(amplitude)
-            norm = norm + amplitude * amplitude.conjugate()
-        finals = []
-        norm = math.sqrt(abs(norm))
-        for r in results:
-            finals.append(r / norm)
-        return finals
+        return cls.execute_post_selects(state_vector, {i: bit}, n_qubit)
+
+
+_tokens = itertools.count()
+
+
+class CheckpointStore:
+    """
+    LRU cache of evolved qulacs states, bounded by max_bytes (16 bytes per amplitude).
+    It is shared by the copies of a circuit, which may run on different threads.
+    """
+
+    def __init__(self, max_bytes=1 << 30):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def keys(self):
+        with self._lock:
+            return list(self._states.keys())
+
+    def get(self, key):
+        """
+        :return the state recorded for key, or None if it has been evicted:
+        """
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None:
+                self._states.move_to_end(key)
+            return state
+
+    def put(self, key, state):
+        size = 16 << state.get_qubit_count()
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._states:
+                self.nbytes -= 16 << self._states.pop(key).get_qubit_count()
+            while self.nbytes + size > self.max_bytes:
+                _, evicted = self._states.popitem(last=False)
+                self.nbytes -= 16 << evicted.get_qubit_count()
+            self._states[key] = state
+            self.nbytes += size
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+            self.nbytes = 0
+
+
+class StateMemo:
+    """
+    Global LRU budget of the states memoized by QulacsCircuit. The circuits are referenced weakly,
+    and the memo of the least recently used circuit is dropped when max_bytes is exceeded.
+    """
+
+    def __init__(self, max_bytes=1 << 30):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._circuits = OrderedDict()
+        # reentrant, since a finalizer calling _remove may run while the lock is held
+        self._lock = threading.RLock()
+
+    def accepts(self, nbytes):
+        return self.max_bytes is None or nbytes <= self.max_bytes
+
+    def touch(self, qc, nbytes):
+        key = id(qc)
+        with self._lock:
+            if key in self._circuits:
+                self.nbytes -= self._circuits.pop(key)[1]
+            else:
+                weakref.finalize(qc, self._remove, key)
+            self._circuits[key] = (weakref.ref(qc), nbytes)
+            self.nbytes += nbytes
+            self.evict()
+
+    def evict(self):
+        with self._lock:
+            while self.max_bytes is not None and self.nbytes > self.max_bytes:
+                _, (ref, size) = self._circuits.popitem(last=False)
+                self.nbytes -= size
+                evicted = ref()
+                if evicted is not None:
+                    evicted._memo = None
+
+    def release(self, qc):
+        self._remove(id(qc))
+
+    def _remove(self, key):
+        with self._lock:
+            if key in self._circuits:
+                self.nbytes -= self._circuits.pop(key)[1]
+
+
+_memo = StateMemo()
+
+
+def set_memo_limit(max_bytes):
+    """
+    :param max_bytes: total bytes of the states memoized by QulacsCircuit (None for no limit, 0 to disable)
+    """
+    _memo.max_bytes = max_bytes
+    _memo.evict()
 
 
 class QulacsCircuit(QWrapper):
     def __init__(self, nqubit, gpu=False):
         super().__init__(nqubit)
         self.gpu = gpu
+        self._circuit = None
         self.circuit = QCircuit(nqubit)
         self.post_selects = {}
         self._ref_state = None
+        self.fusion = None
+        self._fused = None
+        # (version, gate count) of the circuit from which _fused was built
+        self._fused_key = None
+        # bumped by every modification of the gates
+        self._version = 0
+        self.checkpoints = None
+        # (key, state) of the latest simulation
+        self._memo = None
         # print("Create Qulacs Circuit")
 
     def copy(self):
-        result = QulacsCircuit(self.nqubit)
+        result = QulacsCircuit(self.nqubit, self.gpu)
         result.circuit = self.circuit.copy()
         result.post_selects = self.post_selects.copy()
         result._ref_state = self._ref_state
+        result.fusion = self.fusion
+        result._fused = self._fused
+        result._fused_key = self._fused_key
+        result._version = self._version
+        result.checkpoints = self.checkpoints
+        if self.checkpoints is not None:
+            result._lineage = self._fork_lineage()
         return result
 
+    @property
+    def circuit(self):
+        return self._circuit
+
+    @circuit.setter
+    def circuit(self, circuit):
+        # the recorded states and the fused circuit belong to the gates of the previous circuit
+        self._circuit = circuit
+        self._fused = None
+        self._fused_key = None
+        self._reset_lineage()
+
+    def enable_checkpoints(self, max_bytes=1 << 30):
+        """
+        Keep the states recorded by checkpoint() in an LRU store shared with the copies of the circuit,
+        so that the simulation replays only the gates added after the latest valid checkpoint.
+        """
+        self.checkpoints = CheckpointStore(max_bytes)
+
+    def checkpoint(self):
+        """
+        Record the state evolved by the current gates.
+        """
+        if self.checkpoints is None:
+            self.enable_checkpoints()
+        self.checkpoints.put((self._token, self.circuit.get_gate_count()), self._get_evolved_state().copy())
+        profiler.count("state_copies")
+
+    def set_fusion(self, block_size=2):
+        """
+        Simulate a copy of the circuit whose adjacent gates are fused into blocks acting on at most
+        block_size qubits (None disables the fusion). The fused circuit is cached until the gates are modified.
+        """
+        self.fusion = block_size
+        self._fused = None
+        self._fused_key = None
+
     def add_gate(self, gate):
         self.circuit.add_gate(gate)
+        self._version += 1
+
+    def replace_gate(self, index, gate):
+        """
+        Replace index-th gate; the states recorded by checkpoint() are no longer used.
+        """
+        self.circuit.remove_gate(index)
+        self.circuit.add_gate(gate, index)
+        self._version += 1
+        self._reset_lineage()
 
     def h(self, index):
         # print("h {}".format(index))
         self.circuit.add_H_gate(index)
+        self._version += 1
 
     def s(self, index):
         # print("s {}".format(index))
         self.circuit.add_S_gate(index)
+        self._version += 1
 
     def sdag(self, index):
         # print("sdg {}".format(index))
         self.circuit.add_Sdag_gate(index)
+        self._version += 1
 
     def x(self, index):
         # print("x {}".format(index))
         self.circuit.add_X_gate(index)
+        self._version += 1
 
     def y(self, index):
         # print("y {}".format(index))
         self.circuit.add_Y_gate(index)
+        self._version += 1
 
     def z(self, index):
         # print("z {}".format(index))
         self.circuit.add_Z_gate(index)
+        self._version += 1
 
     def rx(self, theta, index):
         # print("rx({}) {}".format(theta, index))
         self.circuit.add_RX_gate(index, -theta)
+        self._version += 1
 
     def ry(self, theta, index):
         # print("ry({}) {}".format(theta, index))
         self.circuit.add_RY_gate(index, -theta)
+        self._version += 1
 
     def rz(self, theta, index):
         # print("rz({}) {}".format(theta, index))
         self.circuit.add_RZ_gate(index, -theta)
+        self._version += 1
 
     def cnot(self, c_index, t_index):
         # print("cx {} {}".format(c_index, t_index))
         self.circuit.add_CNOT_gate(c_index, t_index)
+        self._version += 1
 
     def cy(self, c_index, t_index):
         # print("cy {} {}".format(c_index, t_index))
@@ -232,6 +543,7 @@ class QulacsCircuit(QWrapper):
     def cz(self, c_index, t_index):
         # print("cz {} {}".format(c_index, t_index))
         self.circuit.add_CZ_gate(c_index, t_index)
+        self._version += 1
 
     def get_q_register(self):
         return None
@@ -249,49 +561,34 @@ class QulacsCircuit(QWrapper):
         pass
 
     def get_async_samples(self, nshot) -> Future:
-        def listener():
-            return self.get_samples(nshot)
-
-        return Future(listener)
+        from qwrapper.scheduler import get_scheduler
+        return get_scheduler().submit(seeded_samples, self.copy(), nshot, _sampling_seed())
 
     def get_samples(self, nshot):
-        state = self._get_ref_state()
-        self.circuit.update_quantum_state(state)
-        rs = []
-        dictionary = {}
-        for sample in state.sampling(nshot, random_seed=random.randint(0, 100000)):
-            if sample in dictionary:
-                rs.append(dictionary[sample])
-            else:
-                r = from_bitstring(self._get_bin(sample, self.nqubit))
-                dictionary[sample] = r
-                rs.append(r)
-        return rs
+        return self.get_raw_samples(nshot).bit_lists()
+
+    @profiler.timed("sample")
+    def get_raw_samples(self, nshot) -> Samples:
+        state = self._get_evolved_state()
+        profiler.count("shots", nshot)
+        return Samples(state.sampling(nshot, random_seed=_sampling_seed()), self.nqubit)
 
     def get_counts(self, nshot):
-        state = self._get_ref_state()
-        self.circuit.update_quantum_state(state)
-        r = {}
-        n_q = state.get_qubit_count()
-        for sample in state.sampling(nshot, random_seed=random.randint(0, 100000)):
-            b = self._get_bin(sample, n_q)
-            if b not in r:
-                r[b] = 0
-            r[b] = r[b] + 1
-        return r
+        return self.get_raw_samples(nshot).counts()
 
+    @profiler.timed("get_state")
     def get_state(self):
-        state = self._get_ref_state()
-        self.circuit.update_quantum_state(state)
-        return state
+        profiler.count("state_copies")
+        return self._get_evolved_state().copy()
 
+    @profiler.timed("get_state_vector")
     def get_state_vector(self):
-        state = self._get_ref_state()
-        self.circuit.update_quantum_state(state)
-        return self.execute_post_selects(state.get_vector(), self.post_selects, self.nqubit)
+        state = self._get_evolved_state()
+        return self.execute_post_selects(state.get_vector(), self.post_selects, self.nqubit, inplace=True)
 
     def post_select(self, index, value):
         self.post_selects[self.nqubit - index - 1] = value
+        self._version += 1
 
     def set_ref_state(self, vector):
         if self.gpu:
@@ -301,9 +598,96 @@ class QulacsCircuit(QWrapper):
             state = QuantumState(self.nqubit)
         state.load(vector)
         self._ref_state = state
+        self._reset_lineage()
+
+    def _get_evolved_state(self):
+        """
+        :return the evolved state memoized until the circuit is modified (it must not be modified by the caller):
+        """
+        key = self._memo_key()
+        # read once, since another thread may drop the memo on eviction
+        memo = self._memo
+        if memo is not None and memo[0] == key:
+            _memo.touch(self, 16 << self.nqubit)
+            profiler.count("memo_hits")
+            return memo[1]
+        state = self._run()
+        if _memo.accepts(16 << self.nqubit):
+            self._memo = (key, state)
+            _memo.touch(self, 16 << self.nqubit)
+        return state
+
+    def _memo_key(self):
+        return self.circuit, self.circuit.get_gate_count(), self._version, self._token
+
+    @profiler.timed("simulate")
+    def _run(self):
+        count, checkpoint = self._find_checkpoint()
+        if profiler.enabled():
+            self._count_gates(count)
+        if checkpoint is None:
+            state = self._get_ref_state()
+            self._get_circuit().update_quantum_state(state)
+            return state
+        # the copies are made inside the simulate phase, so only their number is counted
+        state = checkpoint.copy()
+        profiler.count("state_copies")
+        for index in range(count, self.circuit.get_gate_count()):
+            self.circuit.get_gate(index).update_quantum_state(state)
+        return state
+
+    def _count_gates(self, start=0):
+        for index in range(start, self.circuit.get_gate_count()):
+            profiler.count("gate." + self.circuit.get_gate(index).get_name())
+
+    def _find_checkpoint(self):
+        if self.checkpoints is None:
+            return 0, None
+        best = None
+        for token, count in self.checkpoints.keys():
+            if token == self._token:
+                limit = self.circuit.get_gate_count()
+            elif token in self._lineage:
+                limit = self._lineage[token]
+            else:
+                continue
+            if count <= limit and (best is None or count > best[1]):
+                best = (token, count)
+        if best is None:
+            return 0, None
+        state = self.checkpoints.get(best)
+        if state is None:
+            # evicted by another thread in the meantime
+            return 0, None
+        return best[1], state
+
+    def _reset_lineage(self):
+        # token of the checkpoints recorded by the circuit
+        self._token = next(_tokens)
+        # {token of an ancestor: number of gates shared with the ancestor}
+        self._lineage = {}
+
+    def _fork_lineage(self):
+        # only the ancestors having a recorded state are kept, so that the lineage does not grow with the copies
+        recorded = {token for token, _ in self.checkpoints.keys()}
+        lineage = {token: limit for token, limit in self._lineage.items() if token in recorded}
+        lineage[self._token] = self.circuit.get_gate_count()
+        return lineage
+
+    def _get_circuit(self):
+        if self.fusion is None:
+            return self.circuit
+        key = (self._version, self.circuit.get_gate_count())
+        if self._fused is None or self._fused_key != key:
+            fused = self.circuit.copy()
+            QuantumCircuitOptimizer().optimize(fused, self.fusion)
+            self._fused = fused
+            self._fused_key = key
+        return self._fused
 
     def _get_ref_state(self):
         if self._ref_state is not None:
+            profiler.count("state_copies")
             return self._ref_state.copy()
         if self.gpu:
             from qulacs import QuantumStateGpu
@@ -332,6 +716,119 @@ class QulacsCircuit(QWrapper):
         return format(x, 'b').zfill(n)
 
 
+class Parameter:
+    """
+    Symbolic angle slot of ParametricQulacsCircuit, which stands for coeff * params[index].
+    """
+
+    def __init__(self, index, coeff=1.0):
+        self.index = index
+        self.coeff = coeff
+
+    def value(self, params):
+        return self.coeff * params[self.index]
+
+    def __mul__(self, other):
+        return Parameter(self.index, self.coeff * other)
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __neg__(self):
+        return self.__mul__(-1)
+
+    def __repr__(self) -> str:
+        return f'{self.coeff}*theta[{self.index}]'
+
+
+class ParametricQulacsCircuit(QulacsCircuit):
+    """
+    QulacsCircuit whose rotation angles can be Parameter slots. The gate structure is recorded once
+    and evaluated for many parameter vectors by set_parameters or iter_states.
+    """
+
+    def __init__(self, nqubit, gpu=False):
+        super().__init__(nqubit, gpu)
+        self.circuit = ParametricQuantumCircuit(nqubit)
+        # (Parameter, target indices, pauli ids) of each qulacs parameter
+        self.slots = []
+
+    def copy(self):
+        result = ParametricQulacsCircuit(self.nqubit, self.gpu)
+        result.circuit = self.circuit.copy()
+        result.post_selects = self.post_selects.copy()
+        result._ref_state = self._ref_state
+        result.slots = self.slots.copy()
+        return result
+
+    def set_fusion(self, block_size=2):
+        raise NotImplementedError('not supported.')
+
+    def enable_checkpoints(self, max_bytes=1 << 30):
+        raise NotImplementedError('not supported.')
+
+    def _memo_key(self):
+        parameters = tuple(self.circuit.get_parameter(k) for k in range(len(self.slots)))
+        return super()._memo_key() + (parameters,)
+
+    @property
+    def nparams(self):
+        if len(self.slots) == 0:
+            return 0
+        return max(slot[0].index for slot in self.slots) + 1
+
+    def rx(self, theta, index):
+        if isinstance(theta, Parameter):
+            self.circuit.add_parametric_RX_gate(index, 0)
+            self._version += 1
+            self.slots.append((-theta, [index], [1]))
+        else:
+            super().rx(theta, index)
+
+    def ry(self, theta, index):
+        if isinstance(theta, Parameter):
+            self.circuit.add_parametric_RY_gate(index, 0)
+            self._version += 1
+            self.slots.append((-theta, [index], [2]))
+        else:
+            super().ry(theta, index)
+
+    def rz(self, theta, index):
+        if isinstance(theta, Parameter):
+            self.circuit.add_parametric_RZ_gate(index, 0)
+            self._version += 1
+            self.slots.append((-theta, [index], [3]))
+        else:
+            super().rz(theta, index)
+
+    def add_parametric_pauli_rotation(self, indices, pauli_ids, angle: Parameter):
+        """
+        Add exp(i angle P / 2) (the convention of qulacs PauliRotation).
+        """
+        self.circuit.add_parametric_multi_Pauli_rotation_gate(indices, pauli_ids, 0)
+        self._version += 1
+        self.slots.append((angle, indices, pauli_ids))
+
+    def set_parameters(self, params):
+        for k, slot in enumerate(self.slots):
+            self.circuit.set_parameter(k, slot[0].value(params))
+
+    def iter_states(self, params_batch):
+        """
+        Yield the state for each row of params_batch (N x nparams). The same state buffer is reused,
+        so that the yielded state is valid until the next iteration.
+        """
+        state = self._get_ref_state()
+        for params in np.atleast_2d(params_batch):
+            if self._ref_state is None:
+                state.set_zero_state()
+            else:
+                state.load(self._ref_state)
+            self.set_parameters(params)
+            self.circuit.update_quantum_state(state)
+            yield state
+
+
 class QiskitCircuit(QWrapper):
     def __init__(self, nqubit):
         super().__init__(nqubit)
@@ -398,10 +895,8 @@ class QiskitCircuit(QWrapper):
         self.qc.cz(c_index, t_index)
 
     def get_async_samples(self, nshot):
-        def listener():
-            return self.get_samples(nshot)
-
-        return Future(listener)
+        from qwrapper.scheduler import get_scheduler
+        return get_scheduler(processes=True).submit(seeded_samples, self.copy(), nshot, _sampling_seed())
 
     def measure_all(self):
         self.qc.measure_all()
@@ -424,31 +919,45 @@ class QiskitCircuit(QWrapper):
         plt.show()
 
     def get_samples(self, nshot):
+        return self.get_raw_samples(nshot).bitstrings()
+
+    @profiler.timed("sample")
+    def get_raw_samples(self, nshot) -> Samples:
         self.qc.measure_all(add_bits=False)
-        sampler = Sampler()
+        if profiler.enabled():
+            self._count_gates()
+            profiler.count("shots", nshot)
+        sampler = Sampler(seed=_sampling_seed())
         job = sampler.run([self.qc], shots=nshot)
-        results = []
         data_item = None
         for item in job.result()[0].data.items():
             data_item = item
-        for value in data_item[1].array:
-            results.append(QiskitCircuit._get_bin(int(value), self.nqubit))
-        return results
+        raw = np.zeros(nshot, dtype=np.uint64)
+        # the bytes of each shot are stored in big endian order
+        for column in data_item[1].array.T:
+            raw = (raw << np.uint64(8)) | column.astype(np.uint64)
+        return Samples(raw, self.nqubit)
 
     def get_counts(self, nshot):
-        counter = {}
-        for sample in self.get_samples(nshot):
-            sample = "".join([str(v) for v in sample])
-            if sample not in counter:
-                counter[sample] = 0
-            counter[sample] = counter[sample] + 1
-        return counter
+        return self.get_raw_samples(nshot).counts()
 
+    @profiler.timed("get_state_vector")
     def get_state_vector(self):
+        return self._run()
+
+    @profiler.timed("simulate")
+    def _run(self):
+        if profiler.enabled():
+            self._count_gates()
         backend = BasicSimulator()
         statevector = Statevector(self.qc)
         return statevector.data
 
+    def _count_gates(self):
+        for name, value in self.qc.count_ops().items():
+            if name not in ("measure", "barrier"):
+                profiler.count("gate." + name, value)
+
     @classmethod
     def _get_bin(cls, x, n=0):
         """
@@ -477,7 +986,7 @@ class QulacsGate(QWrapper):
     def apply(self, qc: QulacsCircuit):
         gate = self._compile()
         if gate is not None:
-            qc.circuit.add_gate(gate)
+            qc.add_gate(gate)
 
     def _compile(self):
         if self._cache is not None:
@@ -670,6 +1179,8 @@ def init_circuit(nqubit, tool) -> QWrapper:
         return QulacsCircuit(nqubit)
     elif tool == "qulacs-gpu":
         return QulacsCircuit(nqubit, gpu=True)
+    elif tool == "qulacs-parametric":
+        return ParametricQulacsCircuit(nqubit)
     elif tool == 'cudaq':
         return CUDAQuantumCircuit(nqubit)
     return QiskitCircuit(nqubit)
@@ -0,0 +1,126 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from qwrapper.circuit import init_circuit, seeded
+import numpy as np
+import multiprocessing
+import random
+
+
+def run_seeded(task):
+    fn, item, task_seed, seed_globals = task
+    # the states are restored, since SerialExecutor runs the tasks on the caller's thread
+    with seeded(task_seed, seed_globals):
+        return fn(item)
+
+
+class CircuitFactory:
+    """
+    Picklable prepare function: init_circuit(nqubit, tool) followed by build(qc, *args).
+    build has to be a module-level function to be sent to ProcessExecutor.
+    """
+
+    def __init__(self, nqubit, tool="qulacs", build=None, args=()):
+        self.nqubit = nqubit
+        self.tool = tool
+        self.build = build
+        self.args = args
+
+    def __call__(self):
+        qc = init_circuit(self.nqubit, self.tool)
+        if self.build is not None:
+            self.build(qc, *self.args)
+        return qc
+
+
+class Executor(ABC):
+    """
+    Evaluate fn for each item, seeding every task deterministically: the seeds are spawned from seed,
+    or from the global random module when seed is None.
+    """
+
+    def __init__(self, seed=None):
+        self._sequence = None
+        if seed is not None:
+            self._sequence = np.random.SeedSequence(seed)
+
+    def map(self, fn, items):
+        items = list(items)
+        seeds = self._task_seeds(len(items))
+        return self._map(run_seeded, [(fn, item, s, self._seeds_globals()) for item, s in zip(items, seeds)])
+
+    def shutdown(self):
+        pass
+
+    def _task_seeds(self, count):
+        if self._sequence is None:
+            sequence = np.random.SeedSequence(random.getrandbits(64))
+        else:
+            sequence = self._sequence.spawn(1)[0]
+        return sequence.generate_state(count).tolist()
+
+    def _seeds_globals(self):
+        return True
+
+    @abstractmethod
+    def _map(self, fn, tasks):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+
+class SerialExecutor(Executor):
+    def _map(self, fn, tasks):
+        return [fn(task) for task in tasks]
+
+
+class ThreadExecutor(Executor):
+    """
+    Thread pool backend; qulacs releases the GIL during the simulation.
+    Only the sampling seed of qwrapper.circuit is seeded per task, since the global random state is shared.
+    """
+
+    def __init__(self, max_workers=None, seed=None):
+        super().__init__(seed)
+        self.max_workers = max_workers
+        self._pool = None
+
+    def _map(self, fn, tasks):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        return list(self._pool.map(fn, tasks))
+
+    def _seeds_globals(self):
+        return False
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class ProcessExecutor(Executor):
+    """
+    Process pool backend; fn and the items have to be picklable (see CircuitFactory).
+    The workers are spawned rather than forked, since the parent may already run qulacs or pool threads.
+    """
+
+    def __init__(self, max_workers=None, seed=None, chunksize=1):
+        super().__init__(seed)
+        self.max_workers = max_workers
+        self.chunksize = chunksize
+        self._pool = None
+
+    def _map(self, fn, tasks):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return list(self._pool.map(fn, tasks, chunksize=self.chunksize))
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,35 @@
+from qwrapper.sparse import pauli_masks
+from qwrapper.util import QUtil
+import numpy as np
+
+
+def pauli_expectations(vector, p_strings):
+    """
+    Compute <psi|P_k|psi> for all the Pauli strings straight from the state vector.
+    <psi|P|psi> = i^{n_y} sum_j (-1)^{|j & z|} conj(psi[j ^ x]) psi[j], and the product
+    conj(psi[j ^ x]) psi[j] is shared by the terms with the same X mask.
+
+    :param vector: state vector whose j-th bit of the index corresponds to j-th qubit
+    :param p_strings: Pauli strings whose j-th character acts on j-th qubit
+    :return real array of the expectation values:
+    """
+    vector = np.asarray(vector).reshape(-1)
+    indices = np.arange(len(vector), dtype=np.uint64)
+    results = np.zeros(len(p_strings))
+    groups = {}
+    for k, p_string in enumerate(p_strings):
+        x_mask, z_mask, n_y = pauli_masks(p_string)
+        groups.setdefault(x_mask, []).append((k, z_mask, n_y))
+    for x_mask, terms in groups.items():
+        if x_mask == 0:
+            products = np.abs(vector) ** 2
+        else:
+            products = vector[indices ^ np.uint64(x_mask)].conjugate() * vector
+        for k, z_mask, n_y in terms:
+            if z_mask == 0:
+                value = np.sum(products)
+            else:
+                odd = QUtil.bit_parity(indices & np.uint64(z_mask)).astype(bool)
+                value = np.sum(products[~odd]) - np.sum(products[odd])
+            results[k] = ((1j ** (n_y % 4)) * value).real
+    return results
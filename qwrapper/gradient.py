@@ -0,0 +1,76 @@
+from qwrapper.circuit import ParametricQulacsCircuit
+from qwrapper.obs import Hamiltonian
+from qwrapper.optimizer import Optimizer
+from qulacs.gate import Pauli
+from qulacs.state import inner_product
+from abc import ABC, abstractmethod
+import numpy as np
+
+
+class Gradient(ABC):
+    @abstractmethod
+    def __call__(self, params):
+        pass
+
+
+class NumericalGradient(Gradient):
+    def __init__(self, function, epsilon=0.01, executor=None):
+        self.function = function
+        self.epsilon = epsilon
+        self.executor = executor
+
+    def __call__(self, params):
+        return Optimizer.gradient_num_diff(np.array(params, dtype=float), self.function, self.epsilon,
+                                           executor=self.executor)
+
+
+class ParameterShiftGradient(Gradient):
+    """
+    Parameter-shift rule for the functions whose k-th parameter enters a single gate exp(-i scales[k] theta_k P / 2).
+    scales[k] is 1 for rx, ry and rz of QWrapper, and 2 for the time of PauliTimeEvolution.
+    """
+
+    def __init__(self, function, scales=None, executor=None):
+        self.function = function
+        self.scales = scales
+        self.executor = executor
+
+    def __call__(self, params):
+        return Optimizer.gradient_parameter_shift(np.array(params, dtype=float), self.function, self.scales,
+                                                  executor=self.executor)
+
+
+class AdjointGradient(Gradient):
+    """
+    Reverse-mode statevector gradient of hamiltonian.exact_value(qc) with respect to the parameters of qc.
+    It needs one forward pass and one backward pass for two states, independent of the number of parameters.
+    """
+
+    def __init__(self, qc: ParametricQulacsCircuit, hamiltonian: Hamiltonian):
+        self.qc = qc
+        self.hamiltonian = hamiltonian
+
+    def __call__(self, params):
+        circuit = self.qc.circuit
+        self.qc.set_parameters(params)
+        positions = {circuit.get_parametric_gate_position(k): k for k in range(len(self.qc.slots))}
+
+        state = self.qc._get_ref_state()
+        circuit.update_quantum_state(state)
+        work = state.copy()
+        lam = state.copy()
+        self.hamiltonian.get_qulacs_obs().apply_to_state(work, state, lam)
+
+        grad = np.zeros(len(params))
+        for position in range(circuit.get_gate_count() - 1, -1, -1):
+            gate = circuit.get_gate(position)
+            if position in positions:
+                parameter, indices, pauli_ids = self.qc.slots[positions[position]]
+                work.load(state)
+                Pauli(indices, pauli_ids).update_quantum_state(work)
+                # the gate is exp(i angle P / 2), so that dE / d angle = -Im <lam|P|psi>.
+                grad[parameter.index] -= parameter.coeff * inner_product(lam, work).imag
+            inverse = gate.get_inverse()
+            inverse.update_quantum_state(state)
+            inverse.update_quantum_state(lam)
+        return grad
@@ -0,0 +1,116 @@
+from abc import ABC, abstractmethod
+from qwrapper.circuit import QWrapper
+from qwrapper.util import QUtil
+from qwrapper.pauli import PauliString
+from qwrapper.paulisum import pack, nwords
+import numpy as np
+
+
+def _to_pauli(p_string) -> PauliString:
+    if isinstance(p_string, PauliString):
+        return p_string
+    return PauliString.from_str(p_string)
+
+
+def qubit_wise_commute(p_string1, p_string2):
+    return _to_pauli(p_string1).qubit_wise_commutes(_to_pauli(p_string2))
+
+
+class QWCGroup:
+    """
+    Set of qubit-wise-commuting Pauli strings, which are measured at once in the common basis.
+    """
+
+    def __init__(self, nqubit):
+        self.indices = []
+        self.basis = PauliString(0, 0, nqubit)
+
+    @property
+    def basis_string(self):
+        return self.basis.to_str()
+
+    def accepts(self, p_string):
+        return self.basis.qubit_wise_commutes(_to_pauli(p_string))
+
+    def add(self, index, p_string):
+        pauli = _to_pauli(p_string)
+        self.indices.append(index)
+        self.basis = PauliString(self.basis.x | pauli.x, self.basis.z | pauli.z, self.basis.nqubit)
+
+    def append(self, qc: QWrapper):
+        for index in self.basis.support():
+            c = self.basis[index]
+            if c == "X":
+                qc.h(index)
+            elif c == "Y":
+                qc.hsdag(index)
+
+    def evaluate(self, samples, p_strings):
+        """
+        :param samples: integer samples measured after append (j-th bit corresponds to j-th qubit)
+        :param p_strings: Pauli strings (or PauliString) of the whole Hamiltonian
+        :return the expectation values of the Pauli strings in the group (in the order of indices):
+        """
+        samples = np.asarray(samples, dtype=np.uint64)
+        results = []
+        for index in self.indices:
+            bits = QUtil.bit_parity(samples & np.uint64(_to_pauli(p_strings[index]).mask))
+            results.append(1 - 2 * np.mean(bits))
+        return np.array(results)
+
+
+class Grouping(ABC):
+    @abstractmethod
+    def group(self, p_strings) -> [QWCGroup]:
+        pass
+
+
+class GreedyGrouping(Grouping):
+    """
+    Put each Pauli string into the first group compatible with it.
+    """
+
+    def group(self, p_strings):
+        groups = []
+        for index, pauli in enumerate(map(_to_pauli, p_strings)):
+            for group in groups:
+                if group.accepts(pauli):
+                    group.add(index, pauli)
+                    break
+            else:
+                group = QWCGroup(pauli.nqubit)
+                group.add(index, pauli)
+                groups.append(group)
+        return groups
+
+
+class ColoringGrouping(Grouping):
+    """
+    Color the graph whose edges connect non-commuting Pauli strings, visiting the vertices
+    in order of decreasing degree (Welsh-Powell).
+    """
+
+    def group(self, p_strings):
+        if len(p_strings) == 0:
+            return []
+        paulis = [_to_pauli(p_string) for p_string in p_strings]
+        count = nwords(max(pauli.nqubit for pauli in paulis))
+        x = np.array([pack(pauli.x, count) for pauli in paulis])
+        z = np.array([pack(pauli.z, count) for pauli in paulis])
+        masks = x | z
+        conflicts = np.zeros((len(paulis), len(paulis)), dtype=bool)
+        for index in range(len(paulis)):
+            # the same check as PauliString.qubit_wise_commutes on the packed masks
+            differs = (x ^ x[index]) | (z ^ z[index])
+            conflicts[index] = np.any((masks & masks[index] & differs) != 0, axis=1)
+        colors = np.full(len(paulis), -1)
+        for index in np.argsort(-np.sum(conflicts, axis=1), kind="stable"):
+            used = set(colors[conflicts[index]].tolist())
+            color = 0
+            while color in used:
+                color += 1
+            colors[index] = color
+        groups = [QWCGroup(paulis[0].nqubit) for _ in range(np.max(colors) + 1)]
+        for index, color in enumerate(colors):
+            groups[color].add(index, paulis[index])
+        return groups
@@ -2,6 +2,8 @@ import logging
 
 from qwrapper.obs import Hamiltonian
 from qwrapper.operator import ControllablePauli
+from qwrapper.sparse import to_sparse_matrix, PauliSumOperator
+from scipy.sparse.linalg import eigsh
 
 try:
     import cupy as np
@@ -60,18 +62,32 @@ class HeisenbergModel(Hamiltonian):
 
 
 def to_matrix_hamiltonian(hamiltonian: Hamiltonian):
-    result = None
-    count = 0
-    for h, o in zip(hamiltonian.hs, hamiltonian._paulis):
-        if result is None:
-            result = (h + 0j) * o.to_matrix()
-        else:
-            result += (h + 0j) * o.to_matrix()
-        count += 1
-    return result + np.diag([hamiltonian._identity] * len(result))
+    return np.asarray(to_sparse_matrix_hamiltonian(hamiltonian).toarray())
+
+
+def to_sparse_matrix_hamiltonian(hamiltonian: Hamiltonian):
+    table = hamiltonian.pauli_sum
+    return to_sparse_matrix(table.signed_coeffs(), table.paulis(), hamiltonian.nqubit, hamiltonian._identity)
 
 
-def compute_ground_state(hamiltonian: Hamiltonian):
+def to_linear_operator(hamiltonian: Hamiltonian):
+    table = hamiltonian.pauli_sum
+    return PauliSumOperator(table.signed_coeffs(), table.paulis(), hamiltonian.nqubit, hamiltonian._identity)
+
+
+def compute_ground_state(hamiltonian: Hamiltonian, sparse=None, matrix_free=False):
+    """
+    :param sparse: use Lanczos (eigsh) instead of the dense eigh; by default it is used for more than 10 qubits.
+    :param matrix_free: give eigsh the matrix-free operator instead of the sparse matrix.
+    """
+    if sparse is None:
+        sparse = hamiltonian.nqubit > 10
+    if sparse or matrix_free:
+        if matrix_free:
+            operator = to_linear_operator(hamiltonian)
+        else:
+            operator = to_sparse_matrix_hamiltonian(hamiltonian)
+        return eigsh(operator, k=1, which="SA", return_eigenvectors=False)[0].real.item()
     value = min(np.linalg.eigh(to_matrix_hamiltonian(hamiltonian))[0])
     if type(value).__name__ == "ndarray":
         return value.item()
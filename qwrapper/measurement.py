@@ -1,33 +1,162 @@
 from qwrapper.obs import Hamiltonian
+from qwrapper.grouping import Grouping
+from qwrapper.util import QUtil
+from qwrapper.circuit import reseed
+from qwrapper.allocation import ShotAllocator, UniformAllocator, ProportionalAllocator, split_rounds
 import numpy as np
-import random
+
+
+def measure_term(task):
+    prepare, pauli, nshot = task
+    return pauli.get_value(prepare(), nshot)
+
+
+def measure_group(task):
+    """
+    :param task: (prepare, group, nshot, coefficients of the paulis in the group, their masks as a uint64 array)
+    :return (sum of h_k P_k over the shots for each pauli in the group, sum and square sum of the per-shot totals):
+    """
+    prepare, group, nshot, coeffs, masks = task
+    qc = prepare()
+    group.append(qc)
+    samples = np.asarray(qc.get_raw_samples(nshot).raw, dtype=np.uint64)
+    parities = QUtil.bit_parity(masks[:, None] & samples[None, :]).astype(np.int64)
+    values = coeffs[:, None] * (1 - 2 * parities)
+    totals = np.sum(values, axis=0)
+    return np.sum(values, axis=1), np.sum(totals), np.sum(totals * totals)
 
 
 class MeasurementMethod:
-    def __init__(self, hamiltonian: Hamiltonian):
+    def __init__(self, hamiltonian: Hamiltonian, allocator: ShotAllocator = None, rounds=1, executor=None):
+        """
+        :param allocator: how ntotal is shared by the paulis (UniformAllocator by default)
+        :param rounds: number of rounds of adaptive allocation; the shots of each round are
+                       allocated with the variances estimated from the previous rounds.
+        :param executor: qwrapper.executor.Executor evaluating the paulis in parallel
+                         (prepare has to be picklable for ProcessExecutor, e.g. CircuitFactory)
+        """
         self.hamiltonian = hamiltonian
+        if allocator is None:
+            allocator = UniformAllocator()
+        self.allocator = allocator
+        self.rounds = rounds
+        self.executor = executor
+        self.variances = np.ones(len(hamiltonian.paulis))
 
     def get_value(self, prepare, ntotal=0, seed=None):
         return np.sum(self.get_values(prepare, ntotal, seed))
 
+    def get_value_with_error(self, prepare, ntotal, seed=None):
+        """
+        :return (estimate, standard error of the estimate):
+        """
+        values, errors = self.get_values_with_errors(prepare, ntotal, seed)
+        return np.sum(values), np.sqrt(np.sum(np.square(errors)))
+
     def get_values(self, prepare, ntotal=0, seed=None):
-        if seed is not None:
-            random.seed(seed)
         if ntotal == 0:
+            if seed is not None:
+                reseed(seed)
             return self.exact_values(prepare)
-        res = []
-        nshot = ntotal / len(self.hamiltonian.paulis)
-        for h, p in zip(self.hamiltonian.hs, self.hamiltonian.paulis):
-            qc = prepare()
-            res.append(h * p.get_value(qc, nshot))
-        return res
+        return self.get_values_with_errors(prepare, ntotal, seed)[0]
+
+    def get_values_with_errors(self, prepare, ntotal, seed=None):
+        if seed is not None:
+            reseed(seed)
+        hs = np.asarray(self.hamiltonian.hs, dtype=float)
+        # the variances are estimated from scratch for each call
+        self.variances = np.ones(len(hs))
+        sums = np.zeros(len(hs))
+        counts = np.zeros(len(hs), dtype=np.int64)
+        for r, nround in enumerate(split_rounds(ntotal, self.rounds, len(hs))):
+            # every pauli is measured in the first round; the later rounds follow the estimated variances
+            shots = self.allocator.allocate(hs, nround, self.variances, minimum=1 if r == 0 else 0)
+            indices = np.nonzero(shots)[0]
+            tasks = [(prepare, self.hamiltonian.paulis[index], shots[index]) for index in indices]
+            for index, value in zip(indices, self._map(measure_term, tasks)):
+                sums[index] += value * shots[index]
+                counts[index] += shots[index]
+            self._update_variances(sums, counts)
+        means = np.divide(sums, counts, out=np.zeros(len(hs)), where=counts > 0)
+        errors = np.divide(np.abs(hs) * np.sqrt(self.variances), np.sqrt(counts),
+                           out=np.zeros(len(hs)), where=counts > 0)
+        return list(hs * means), list(errors)
+
+    def _update_variances(self, sums, counts):
+        # each shot of a pauli is +1 or -1, so the variance is 1 - <P>^2 (with Bessel's correction).
+        measured = counts > 1
+        means = sums[measured] / counts[measured]
+        n = counts[measured]
+        self.variances[measured] = (1 - means * means) * n / (n - 1)
 
     def exact_value(self, prepare):
         return np.sum(self.exact_values(prepare))
 
     def exact_values(self, prepare):
-        res = []
-        for h, p in zip(self.hamiltonian.hs, self.hamiltonian.paulis):
-            qc = prepare()
-            res.append(h * p.exact_value(qc))
-        return res
+        # all the terms are evaluated from a single simulation
+        values = self.hamiltonian.term_values(prepare())
+        return list(np.asarray(self.hamiltonian.hs, dtype=float) * values)
+
+    def _map(self, fn, tasks):
+        if self.executor is None:
+            return [fn(task) for task in tasks]
+        return self.executor.map(fn, tasks)
+
+
+class GroupedMeasurementMethod(MeasurementMethod):
+    """
+    Prepare and sample the circuit once per qubit-wise-commuting group of the paulis.
+    """
+
+    def __init__(self, hamiltonian: Hamiltonian, grouping: Grouping = None, allocator: ShotAllocator = None,
+                 rounds=1, executor=None):
+        """
+        :param rounds: number of rounds of adaptive allocation over the groups
+        :param executor: qwrapper.executor.Executor measuring the groups in parallel
+        """
+        if allocator is None:
+            allocator = ProportionalAllocator()
+        super().__init__(hamiltonian, allocator, rounds, executor)
+        self.grouping = grouping
+        # variances of the per-shot totals of the groups divided by their weights squared,
+        # so that NeymanAllocator allocates the shots proportionally to the standard deviations
+        self.variances = None
+
+    def get_values_with_errors(self, prepare, ntotal, seed=None):
+        """
+        :return (contribution of each pauli, standard error of each group):
+        """
+        if seed is not None:
+            reseed(seed)
+        table = self.hamiltonian.pauli_sum
+        coeffs = table.signed_coeffs()
+        paulis = table.paulis()
+        groups = self.hamiltonian.get_groups(self.grouping)
+        masks = [np.array([paulis[index].mask for index in group.indices], dtype=np.uint64) for group in groups]
+        weights = np.array([table.norm(group.indices) for group in groups])
+        self.variances = np.ones(len(groups))
+        sums = np.zeros(len(coeffs))
+        totals = np.zeros(len(groups))
+        squares = np.zeros(len(groups))
+        counts = np.zeros(len(groups), dtype=np.int64)
+        for r, nround in enumerate(split_rounds(ntotal, self.rounds, len(groups))):
+            shots = self.allocator.allocate(weights, nround, self.variances, minimum=1 if r == 0 else 0)
+            indices = np.nonzero(shots)[0]
+            # each task carries only the terms of its group, which matters for ProcessExecutor
+            tasks = [(prepare, groups[g], shots[g], coeffs[groups[g].indices], masks[g]) for g in indices]
+            for g, (values, total, square) in zip(indices, self._map(measure_group, tasks)):
+                sums[groups[g].indices] += values
+                totals[g] += total
+                squares[g] += square
+                counts[g] += shots[g]
+            measured = counts > 1
+            n = counts[measured]
+            means = totals[measured] / n
+            variances = (squares[measured] / n - means * means) * n / (n - 1)
+            self.variances[measured] = np.clip(variances, 0, None) / np.maximum(weights[measured] ** 2, 1e-300)
+        res = [0.0] * len(coeffs)
+        for g, group in enumerate(groups):
+            for index in group.indices:
+                res[index] = sums[index] / counts[g]
+        errors = np.sqrt(self.variances * weights ** 2 / counts)
+        return res, list(errors)
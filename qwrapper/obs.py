@@ -2,8 +2,15 @@ import abc, logging
 from abc import abstractmethod
 from qwrapper.circuit import QWrapper
 from qwrapper.util import QUtil
-from qulacs import QuantumState, Observable
-from qwrapper.circuit import QulacsCircuit, CUDAQuantumCircuit
+from qulacs import QuantumState, Observable, PauliOperator
+from qwrapper.circuit import QulacsCircuit, QiskitCircuit, CUDAQuantumCircuit, ParametricQulacsCircuit
+from qwrapper.grouping import Grouping, ColoringGrouping
+from qwrapper.allocation import ShotAllocator, ProportionalAllocator
+from qwrapper.sparse import to_sparse_matrix
+from qwrapper.expectation import pauli_expectations
+from qwrapper.pauli import PauliString
+from qwrapper import profiler
+from qwrapper.paulisum import PauliSum, save_binary, load_binary, iter_chunks, is_binary, read_header
 
 try:
     import cupy as np
@@ -27,6 +34,19 @@ def build_operator_str(p_string):
     return " ".join(array)
 
 
+def exact_state_vector(qc: QWrapper):
+    """
+    :return state vector used by the exact expectation values, which ignores the post-selections of qc
+            in the same way as the qulacs observables:
+    """
+    if isinstance(qc, CUDAQuantumCircuit):
+        raise NotImplementedError('not supported.')
+    if isinstance(qc, QulacsCircuit):
+        # the memoized state is only read, so that it is not copied
+        return qc._get_evolved_state().get_vector()
+    return qc.get_state_vector()
+
+
 class Pauli:
     X = np.array([[0, 1], [1, 0]])
     Y = np.array([[0, -1j], [1j, 0]])
@@ -46,64 +66,78 @@ class Obs(abc.ABC):
 
 class PauliObservable(Obs):
     def __init__(self, p_string, sign=1):
-        self._p_string = p_string
+        """
+        :param p_string: Pauli string (ex. "XIZ") or PauliString
+        """
+        if isinstance(p_string, PauliString):
+            self._pauli = p_string
+        else:
+            self._pauli = PauliString.from_str(p_string)
         self._sign = sign
-        self.matrix = None
         self.qulacs_obs = None
 
     def copy(self):
-        return PauliObservable(self._p_string, self._sign)
+        return PauliObservable(self._pauli, self._sign)
+
+    def __getstate__(self):
+        # the cached backend objects are not picklable
+        state = self.__dict__.copy()
+        state["qulacs_obs"] = None
+        return state
 
     @property
     def nqubit(self):
-        return len(self.p_string)
+        return self._pauli.nqubit
 
     @property
     def p_string(self):
-        return self._p_string
+        return self._pauli.to_str()
+
+    @property
+    def pauli(self) -> PauliString:
+        return self._pauli
 
     @property
     def sign(self):
         return self._sign
 
+    @profiler.timed("get_value")
     def get_value(self, qc: QWrapper, nshot):
         if nshot == 0:
             return self.exact_value(qc)
         excludes = self._append(qc)
-        result = 0
-        for sample in qc.get_samples(nshot):
-            result += QUtil.parity(sample, excludes)
-        return self.sign * result / nshot
+        if isinstance(qc, (QulacsCircuit, QiskitCircuit)):
+            samples = qc.get_raw_samples(nshot).raw
+        else:
+            samples = qc.get_samples(nshot)
+        return self.sign * int(QUtil.parities(samples, excludes).sum()) / nshot
 
+    @profiler.timed("exact_value")
     def exact_value(self, qc: QWrapper):
         if isinstance(qc, QulacsCircuit):
             if self.qulacs_obs is None:
                 self.qulacs_obs = self._build_qulacs_obs()
-            return self.qulacs_obs.get_expectation_value(qc.get_state())
-        if self.matrix is None:
-            self.matrix = self.to_matrix()
-        vector = qc.get_state_vector()
-        return vector.T.conjugate().dot(self.matrix).dot(vector).item(0, 0).real
+            return self.qulacs_obs.get_expectation_value(qc._get_evolved_state())
+        return self.sign * pauli_expectations(exact_state_vector(qc), [self._pauli])[0].item()
 
     def _build_qulacs_obs(self):
-        observable = Observable(len(self.p_string))
-        observable.add_operator(self.sign, build_operator_str(self.p_string))
+        observable = Observable(self.nqubit)
+        observable.add_operator(self.sign, self._pauli.to_operator_str())
         return observable
 
     def add_circuit(self, qc: QWrapper):
-        index = 0
-        for c in self.p_string:
+        for index in self._pauli.support():
+            c = self._pauli[index]
             if c == "X":
                 qc.x(index)
             elif c == "Y":
                 qc.y(index)
             elif c == "Z":
                 qc.z(index)
-            index += 1
 
     def add_controlled_circuit(self, control, targets, qc: QWrapper):
-        index = 0
-        for c in self.p_string:
+        for index in self._pauli.support():
+            c = self._pauli[index]
             target = targets[index]
             if c == "X":
                 qc.cx(control, target)
@@ -111,31 +145,30 @@ class PauliObservable(Obs):
                 qc.cy(control, target)
             elif c == "Z":
                 qc.cz(control, target)
-            index += 1
 
     def to_matrix(self):
         m = {"X": Pauli.X, "Y": Pauli.Y,
              "Z": Pauli.Z, "I": Pauli.I}
         matrix = None
-        for c in self._p_string:
+        for c in self.p_string:
             if matrix is None:
                 matrix = m[c]
             else:
                 matrix = np.kron(m[c], matrix)
         return self.sign * matrix
 
+    def to_sparse_matrix(self):
+        return to_sparse_matrix([self.sign], [self._pauli], self.nqubit)
+
     def _append(self, qc: QWrapper):
-        index = 0
-        excludes = set()
-        for c in self._p_string:
+        support = self._pauli.support()
+        for index in support:
+            c = self._pauli[index]
             if c == "X":
                 qc.h(index)
             elif c == "Y":
                 qc.hsdag(index)
-            elif c == "I":
-                excludes.add(index)
-            index = index + 1
-        return excludes
+        return set(range(self.nqubit)).difference(support)
 
     def __repr__(self) -> str:
         sign_str = '+'
@@ -158,28 +191,80 @@ class Future:
 
 class Hamiltonian(Obs):
     def __init__(self, hs, paulis: [PauliObservable], nqubit, identity=0):
-        self._hs = hs
+        self._table = PauliSum.from_paulis(hs, paulis, nqubit)
+        # the given list is kept as is; from_pauli_sum builds it from the table only when accessed
         self._paulis = paulis
         self._nqubit = nqubit
         self._qulacs_obs = None
-        self._matrix = None
         self._identity = identity
         self._cudaq_obs = None
+        self._groups = None
+        self._pauli_operators = None
+
+    @classmethod
+    def from_pauli_sum(cls, table: PauliSum, identity=0):
+        """
+        :param table: PauliSum of the terms; the PauliObservable list is built only when paulis is accessed
+        """
+        hamiltonian = Hamiltonian([], [], table.nqubit, identity)
+        hamiltonian._table = table
+        hamiltonian._paulis = None
+        return hamiltonian
+
+    def __getstate__(self):
+        # the cached backend objects are not picklable
+        state = self.__dict__.copy()
+        state["_qulacs_obs"] = None
+        state["_cudaq_obs"] = None
+        state["_pauli_operators"] = None
+        return state
 
     def save(self, path):
         path = path.replace(" ", "-")
         with open(path, "w") as f:
-            for h, pauli in zip(self._hs, self._paulis):
-                f.write(f"{h}\t{pauli.p_string}\t{pauli.sign}\n")
+            for k, h in enumerate(self._table.coeffs.tolist()):
+                f.write(f"{h}\t{self._table.pauli(k).to_str()}\t{self._table.signs[k]}\n")
 
     def set_hs(self, hs):
-        self._hs = hs
+        """
+        Replace the coefficients; the backend observables are rebuilt lazily from the cached Pauli structure.
+        """
+        self._table.set_coeffs(hs)
+        self._qulacs_obs = None
+        self._cudaq_obs = None
 
-    def get_value(self, qc: QWrapper, nshot, **kwargs):
+    @profiler.timed("get_value")
+    def get_value(self, qc: QWrapper, nshot, grouping: Grouping = None, allocator: ShotAllocator = None, **kwargs):
+        """
+        :param nshot: total number of shots, which is shared by the qubit-wise-commuting groups of the paulis
+        :param grouping: how the paulis are grouped (ColoringGrouping by default)
+        :param allocator: how the shots are allocated to the groups (ProportionalAllocator by default)
+        """
         if nshot == 0:
             return self.exact_value(qc, **kwargs)
-        raise NotImplementedError("get_value for finite shot is not implemented in Hamiltonian class.")
-
+        if allocator is None:
+            allocator = ProportionalAllocator()
+        groups = self.get_groups(grouping)
+        weights = [self._table.norm(group.indices) for group in groups]
+        p_strings = self._table.paulis()
+        result = 0
+        for group, n in zip(groups, allocator.allocate(weights, nshot)):
+            if n == 0:
+                continue
+            circuit = qc.copy()
+            group.append(circuit)
+            values = group.evaluate(circuit.get_raw_samples(n).raw, p_strings)
+            result += self._table.dot(values, group.indices)
+        return result + self._identity
+
+    def get_groups(self, grouping: Grouping = None):
+        if grouping is None:
+            grouping = ColoringGrouping()
+        if self._groups is None or self._groups[0] != type(grouping):
+            self._groups = (type(grouping), grouping.group(self._table.paulis()))
+        return self._groups[1]
+
+    @profiler.timed("exact_value")
     def exact_value(self, qc: QWrapper, **kwargs):
         if isinstance(qc, CUDAQuantumCircuit):
             if self._cudaq_obs is None:
@@ -199,30 +284,73 @@ class Hamiltonian(Obs):
             return cudaq.observe(qc.kernel, self._cudaq_obs).expectation_z() + self._identity
 
         if isinstance(qc, QulacsCircuit):
-            if self._qulacs_obs is None:
-                self._qulacs_obs = self._build_qulacs_obs()
-            return self._qulacs_obs.get_expectation_value(qc.get_state()) + self._identity
-        if self._matrix is None:
-            matrix = np.diag(np.zeros(pow(2, self.nqubit), dtype=np.complex128))
-            for h, p in zip(self._hs, self._paulis):
-                matrix += h * p.to_matrix()
-            self._matrix = matrix
-        vector = qc.get_state_vector()
-        return vector.T.conjugate().dot(self._matrix).dot(vector).real + self._identity
+            return self.get_qulacs_obs().get_expectation_value(qc._get_evolved_state()) + self._identity
+        values = pauli_expectations(exact_state_vector(qc), self._table.paulis())
+        return self._table.dot(values) + self._identity
+
+    @profiler.timed("term_values")
+    def term_values(self, qc: QWrapper):
+        """
+        :return array of the values of the paulis (sign included) computed from a single simulation of qc:
+        """
+        return self._table.signs * pauli_expectations(exact_state_vector(qc), self._table.paulis())
+
+    def reweight(self, term_values, hs=None):
+        """
+        :param term_values: values of the paulis returned by term_values
+        :param hs: coefficients replacing those of the Hamiltonian
+        :return the expectation value of the Hamiltonian with the coefficients hs:
+        """
+        if hs is None:
+            hs = self._table.coeffs
+        return np.dot(np.asarray(hs), np.asarray(term_values)).item() + self._identity
+
+    def batch_exact_values(self, qc: ParametricQulacsCircuit, params_batch):
+        """
+        :param params_batch: (N x nparams) array of the parameters of qc
+        :return the exact values for each row of params_batch:
+        """
+        observable = self.get_qulacs_obs()
+        return [observable.get_expectation_value(state) + self._identity for state in qc.iter_states(params_batch)]
+
+    def get_qulacs_obs(self):
+        """
+        :return qulacs Observable of the Hamiltonian (the identity term is not included):
+        """
+        if self._qulacs_obs is None:
+            self._qulacs_obs = self._build_qulacs_obs()
+        return self._qulacs_obs
 
     @classmethod
     def load(cls, path):
         path = path.replace(" ", "-")
         hs = []
-        paulis = []
+        p_strings = []
+        signs = []
         n_qubit = None
         with open(path) as f:
-            for l in f.readlines():
+            for l in f:
                 h, p_string, sign = l.rstrip().split('\t')
                 n_qubit = len(p_string)
                 hs.append(float(h))
-                paulis.append(PauliObservable(p_string, int(sign)))
-        return Hamiltonian(hs, paulis, n_qubit)
+                p_strings.append(p_string)
+                signs.append(int(sign))
+        return Hamiltonian.from_pauli_sum(PauliSum.from_paulis(hs, p_strings, n_qubit, signs))
+
+    def save_binary(self, path):
+        """
+        Write the Hamiltonian as a raw binary file which load_binary maps into memory,
+        or as .npz when path ends with ".npz".
+        """
+        save_binary(self._table, path.replace(" ", "-"), self._identity)
+
+    @classmethod
+    def load_binary(cls, path, mmap=True):
+        """
+        :param mmap: map the coefficients and the Pauli tables lazily instead of reading them
+        """
+        table, identity = load_binary(path.replace(" ", "-"), mmap)
+        return Hamiltonian.from_pauli_sum(table, identity)
 
     @property
     def nqubit(self):
@@ -230,39 +358,143 @@ class Hamiltonian(Obs):
 
     @property
     def hs(self):
-        return self._hs
+        return self._table.coeffs
 
     @property
     def paulis(self):
+        if self._paulis is None:
+            self._paulis = [PauliObservable(pauli, sign)
+                            for pauli, sign in zip(self._table.paulis(), self._table.signs.tolist())]
         return self._paulis
 
+    @property
+    def pauli_sum(self) -> PauliSum:
+        return self._table
+
     def lam(self):
-        result = 0
-        for h in self._hs:
-            result += h
-        return result
+        return self._table.lam()
+
+    def simplify(self, atol=0):
+        """
+        :return Hamiltonian whose duplicated Pauli strings are merged:
+        """
+        return Hamiltonian.from_pauli_sum(self._table.simplify(atol), self._identity)
+
+    def drop_small(self, tol):
+        """
+        :return Hamiltonian without the terms whose absolute coefficients are not larger than tol:
+        """
+        return Hamiltonian.from_pauli_sum(self._table.drop_small(tol), self._identity)
+
+    def __mul__(self, other):
+        return Hamiltonian.from_pauli_sum(self._table * other, self._identity * other)
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __add__(self, other):
+        return Hamiltonian.from_pauli_sum(self._table + other.pauli_sum, self._identity + other._identity)
 
     def gen_ancilla_hamiltonian(self, ancilla_obs="X"):
-        paulis = []
-        for p in self._paulis:
-            paulis.append(PauliObservable(p.p_string + ancilla_obs, p.sign))
-        return Hamiltonian(self.hs, paulis, self.nqubit + 1)
+        return Hamiltonian.from_pauli_sum(self._table.tensor(PauliString.from_str(ancilla_obs)))
+
+    def to_sparse_matrix(self):
+        """
+        :return scipy.sparse CSR matrix of the Hamiltonian (the identity term is not included):
+        """
+        return to_sparse_matrix(self._table.signed_coeffs(), self._table.paulis(), self.nqubit)
 
+    @profiler.timed("build_observable")
     def _build_qulacs_obs(self):
         observable = Observable(self.nqubit)
-        for h, p in zip(self._hs, self._paulis):
-            observable.add_operator(h * p.sign, build_operator_str(p.p_string))
+        for operator, h in zip(self._get_pauli_operators(), self._table.signed_coeffs().tolist()):
+            # add_operator copies the term, so that the cached operator can be reused
+            operator.change_coef(h)
+            observable.add_operator(operator)
         return observable
 
+    def _get_pauli_operators(self):
+        if self._pauli_operators is None:
+            operators = []
+            for pauli in self._table.paulis():
+                operator = PauliOperator(1.0)
+                for index, pauli_id in zip(pauli.support(), pauli.pauli_ids()):
+                    operator.add_single_Pauli(index, pauli_id)
+                operators.append(operator)
+            self._pauli_operators = operators
+        return self._pauli_operators
+
+    @profiler.timed("build_observable")
     def _build_cudaq_obs(self):
         observable = cudaq.SpinOperator()
-        for h, p in zip(self._hs, self._paulis):
-            observable += h * p.sign * cudaq.SpinOperator.from_word(p.p_string)
+        for k, h in enumerate(self._table.signed_coeffs().tolist()):
+            observable += h * cudaq.SpinOperator.from_word(self._table.pauli(k).to_str())
         return observable - cudaq.SpinOperator()
 
     def __repr__(self) -> str:
         result = ""
-        result += ",".join([p.p_string for p in self._paulis])
+        result += ",".join([p.to_str() for p in self._table.paulis()])
         result += "\n"
-        result += ",".join([str(h) for h in self._hs])
+        result += ",".join([str(h) for h in self._table.coeffs.tolist()])
         return result
+
+
+class StreamingHamiltonian(Obs):
+    """
+    Hamiltonian file (raw binary or text) evaluated chunk by chunk, so that only chunk_size terms
+    are held in memory at once.
+    """
+
+    def __init__(self, path, chunk_size=100000, identity=None):
+        self.path = path.replace(" ", "-")
+        self.chunk_size = chunk_size
+        if identity is None:
+            identity = read_header(self.path)[3] if is_binary(self.path) else 0
+        self._identity = identity
+        self._norms = None
+
+    def chunks(self):
+        """
+        :return iterator of PauliSum chunks:
+        """
+        return iter_chunks(self.path, self.chunk_size)
+
+    @profiler.timed("exact_value")
+    def exact_value(self, qc: QWrapper):
+        if isinstance(qc, CUDAQuantumCircuit):
+            raise NotImplementedError('not supported.')
+        result = 0
+        if isinstance(qc, QulacsCircuit):
+            state = qc._get_evolved_state()
+            for chunk in self.chunks():
+                result += Hamiltonian.from_pauli_sum(chunk).get_qulacs_obs().get_expectation_value(state)
+        else:
+            vector = exact_state_vector(qc)
+            for chunk in self.chunks():
+                result += chunk.dot(pauli_expectations(vector, chunk.paulis()))
+        return result + self._identity
+
+    @profiler.timed("get_value")
+    def get_value(self, qc: QWrapper, nshot, grouping: Grouping = None, allocator: ShotAllocator = None):
+        """
+        :param nshot: total number of shots, which is allocated to the chunks by allocator
+        (ProportionalAllocator by default) and then to the qubit-wise-commuting groups in each chunk
+        """
+        if nshot == 0:
+            return self.exact_value(qc)
+        if allocator is None:
+            allocator = ProportionalAllocator()
+        result = 0
+        for chunk, n in zip(self.chunks(), allocator.allocate(self.norms(), nshot)):
+            if n == 0:
+                continue
+            result += Hamiltonian.from_pauli_sum(chunk).get_value(qc, n, grouping, allocator)
+        return result + self._identity
+
+    def norms(self):
+        """
+        :return sum of the absolute coefficients of each chunk:
+        """
+        if self._norms is None:
+            self._norms = [chunk.norm() for chunk in self.chunks()]
+        return self._norms
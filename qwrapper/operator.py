@@ -1,6 +1,8 @@
-from qwrapper.circuit import QWrapper, QulacsCircuit, CUDAQuantumCircuit
+from qwrapper.circuit import QWrapper, QulacsCircuit, CUDAQuantumCircuit, ParametricQulacsCircuit, Parameter
 from qwrapper.obs import PauliObservable
+from qwrapper.pauli import PauliString
 from qulacs.gate import PauliRotation
+from functools import lru_cache
 import logging
 
 try:
@@ -9,6 +11,22 @@ except ImportError:
     logging.debug("cudaq is not imported.")
 
 
+@lru_cache(maxsize=1 << 16)
+def pauli_structure(pauli: PauliString):
+    """
+    :return (target indices, qulacs pauli ids) of the Pauli string, shared by all the evolutions of it:
+    """
+    return tuple(pauli.support()), tuple(pauli.pauli_ids())
+
+
+def rotation_gate(pauli: PauliString, angle):
+    """
+    :return qulacs PauliRotation exp(i angle P / 2):
+    """
+    indices, pauli_ids = pauli_structure(pauli)
+    return PauliRotation(list(indices), list(pauli_ids), angle)
+
+
 class Operator:
     def add_circuit(self, qc: QWrapper):
         pass
@@ -16,18 +34,38 @@ class Operator:
 
 class PauliTimeEvolution(Operator):
     def __init__(self, pauli: PauliObservable, t, cachable=True):
+        """
+        :param t: evolution time, or Parameter of ParametricQulacsCircuit so that t can be updated in place
+                  by set_parameters without rebuilding the circuit
+        """
         self.pauli = pauli
-        self.t = t
+        self._t = t
         self.cache = None
         self.cachable = cachable
 
+    @property
+    def t(self):
+        return self._t
+
+    @t.setter
+    def t(self, t):
+        # the cached gate is built for the old t
+        self._t = t
+        self.cache = None
+
     def add_circuit(self, qc: QWrapper):
         if isinstance(qc, CUDAQuantumCircuit):
-            if self.pauli.p_string != len(self.pauli.p_string) * 'I':
+            if self.pauli.pauli.weight != 0:
                 qc.gatesToApply.append(lambda qarg: qc.kernel.exp_pauli(
                     self.pauli.sign * self.t, qarg, self.pauli.p_string))
             return
 
+        if isinstance(qc, ParametricQulacsCircuit) and isinstance(self.t, Parameter):
+            indices, pauli_ids = self._pauli_structure()
+            if len(indices) != 0:
+                qc.add_parametric_pauli_rotation(list(indices), list(pauli_ids), 2 * self.pauli.sign * self.t)
+            return
+
         if not isinstance(qc, QulacsCircuit) or not self.cachable:
             qc.barrier()
             self._do_add_circuit(qc)
@@ -37,19 +75,10 @@ class PauliTimeEvolution(Operator):
             qc.add_gate(self.cache)
 
     def _build_gate(self):
-        array = []
-        pauli_indices = []
-        for j, c in enumerate(self.pauli.p_string):
-            if c == 'X':
-                pauli_indices.append(1)
-                array.append(j)
-            elif c == 'Y':
-                pauli_indices.append(2)
-                array.append(j)
-            elif c == 'Z':
-                pauli_indices.append(3)
-                array.append(j)
-        return PauliRotation(array, pauli_indices, 2 * self.pauli.sign * self.t)
+        return rotation_gate(self.pauli.pauli, 2 * self.pauli.sign * self.t)
+
+    def _pauli_structure(self):
+        return pauli_structure(self.pauli.pauli)
 
     def _do_add_circuit(self, qc: QWrapper):
         self._rotate_basis(qc)
@@ -67,8 +96,9 @@ class PauliTimeEvolution(Operator):
         self._rotate_basis(qc, inverse=True)
 
     def _rotate_basis(self, qc: QWrapper, inverse=False):
-        index = 0
-        for c in self.pauli.p_string:
+        pauli = self.pauli.pauli
+        for index in self._pauli_structure()[0]:
+            c = pauli[index]
             if c == "X":
                 qc.h(index)
             elif c == "Y":
@@ -77,30 +107,16 @@ class PauliTimeEvolution(Operator):
                     qc.s(index)
                 else:
                     qc.hsdag(index)
-            index += 1
 
     def _last_nonidentity_index(self):
-        index = 0
-        result = None
-        for c in self.pauli.p_string:
-            if c != "I":
-                result = index
-            index += 1
-        return result
+        mask = self.pauli.pauli.mask
+        if mask == 0:
+            return None
+        return mask.bit_length() - 1
 
     def _cnot_pairs(self):
-        results = []
-        index = 0
-        prev = None
-        for c in self.pauli.p_string:
-            if c == "I":
-                index += 1
-                continue
-            if prev is not None:
-                results.append((prev, index))
-            prev = index
-            index += 1
-        return results
+        support = self._pauli_structure()[0]
+        return list(zip(support[:-1], support[1:]))
 
 
 class ControllableOperator(Operator):
@@ -110,27 +126,10 @@ class ControllableOperator(Operator):
 
 class ControllablePauli(PauliObservable, ControllableOperator):
     def add_controlled_circuit(self, control, targets, qc: QWrapper):
-        index = 0
-        for c in self.p_string:
-            target = targets[index]
-            if c == "X":
-                qc.cx(control, target)
-            elif c == "Y":
-                qc.cy(control, target)
-            elif c == "Z":
-                qc.cz(control, target)
-            index += 1
+        PauliObservable.add_controlled_circuit(self, control, targets, qc)
 
     def add_circuit(self, qc: QWrapper):
-        index = 0
-        for c in self.p_string:
-            if c == "X":
-                qc.x(index)
-            elif c == "Y":
-                qc.y(index)
-            elif c == "Z":
-                qc.z(index)
-            index += 1
+        PauliObservable.add_circuit(self, qc)
 
     @classmethod
     def from_str(cls, str):
@@ -6,7 +6,10 @@ class Optimizer(object):
         pass
 
     @classmethod
-    def gradient_num_diff(cls, x_center, f, epsilon, recorder=None):
+    def gradient_num_diff(cls, x_center, f, epsilon, recorder=None, executor=None):
+        """
+        :param executor: qwrapper.executor.Executor evaluating the shifted points in parallel
+        """
         grad = np.zeros((len(x_center),), float)
         points = []
         ei = np.zeros((len(x_center),), float)
@@ -16,6 +19,14 @@ class Optimizer(object):
             point = x_center + d
             points.append(point)
             ei[k] = 0.0
+        if executor is not None:
+            values = executor.map(f, [x_center] + points)
+            base = values[0]
+            if recorder:
+                recorder.record(base)
+            for i, value in enumerate(values[1:]):
+                grad[i] = (value - base) / epsilon
+            return grad
         base = f(x_center)
         if recorder:
             recorder.record(base)
@@ -23,6 +34,29 @@ class Optimizer(object):
             grad[i] = (f(point) - base) / epsilon
         return grad
 
+    @classmethod
+    def gradient_parameter_shift(cls, x_center, f, scales=None, recorder=None, executor=None):
+        """
+        :param scales: k-th parameter is assumed to enter a single gate exp(-i scales[k] x[k] P / 2) (1 by default)
+        :param executor: qwrapper.executor.Executor evaluating the shifted points in parallel
+        """
+        if scales is None:
+            scales = np.ones(len(x_center))
+        if recorder:
+            recorder.record(f(x_center))
+        points = []
+        ei = np.zeros((len(x_center),), float)
+        for k in range(len(x_center)):
+            ei[k] = np.pi / (2 * scales[k])
+            points.append(x_center + ei)
+            points.append(x_center - ei)
+            ei[k] = 0.0
+        if executor is not None:
+            values = executor.map(f, points)
+        else:
+            values = [f(point) for point in points]
+        return np.array(scales) * (np.array(values[0::2]) - np.array(values[1::2])) / 2
+
     @classmethod
     def wrap_function(cls, function, args):
         def function_wrapper(*wrapper_args):
@@ -125,7 +159,12 @@ class AdamOptimizer(Optimizer):
                 params = params_new
         return params_new, self._t
 
-    def optimize(self, function, init_args):
-        gradient_function = Optimizer.wrap_function(Optimizer.gradient_num_diff, (function, 0.01))
+    def optimize(self, function, init_args, gradient_function=None):
+        """
+        :param gradient_function: params -> gradient (e.g. qwrapper.gradient.AdjointGradient);
+                                  forward finite differences are used by default
+        """
+        if gradient_function is None:
+            gradient_function = Optimizer.wrap_function(Optimizer.gradient_num_diff, (function, 0.01))
         params_new, t = self.do_optimize(gradient_function, init_args, function)
         return params_new, function(params_new), t
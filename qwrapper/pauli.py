@@ -0,0 +1,109 @@
+_CHARS = "IXZY"
+_IDS = {"X": 1, "Y": 2, "Z": 3}
+
+
+def popcount(value):
+    return bin(value).count("1")
+
+
+class PauliString:
+    """
+    Pauli string packed into X and Z bitmasks (j-th bit corresponds to j-th qubit), standing for
+    i^{|x & z|} X^x Z^z; i.e. both bits are set for Y.
+    """
+    __slots__ = ("x", "z", "nqubit")
+
+    def __init__(self, x, z, nqubit):
+        self.x = x
+        self.z = z
+        self.nqubit = nqubit
+
+    @classmethod
+    def from_str(cls, p_string):
+        x = 0
+        z = 0
+        for j, c in enumerate(p_string):
+            if c == "X":
+                x |= 1 << j
+            elif c == "Y":
+                x |= 1 << j
+                z |= 1 << j
+            elif c == "Z":
+                z |= 1 << j
+            elif c != "I":
+                raise AttributeError(f'{c} is not a Pauli')
+        return PauliString(x, z, len(p_string))
+
+    def to_str(self):
+        return "".join([self[j] for j in range(self.nqubit)])
+
+    def __getitem__(self, j):
+        return _CHARS[(self.x >> j & 1) | (self.z >> j & 1) << 1]
+
+    @property
+    def mask(self):
+        return self.x | self.z
+
+    @property
+    def weight(self):
+        return popcount(self.mask)
+
+    @property
+    def n_y(self):
+        return popcount(self.x & self.z)
+
+    def support(self):
+        """
+        :return the indices of the qubits on which the Pauli string acts non-trivially:
+        """
+        results = []
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            results.append(low.bit_length() - 1)
+            mask ^= low
+        return results
+
+    def pauli_ids(self):
+        """
+        :return the qulacs pauli ids (X: 1, Y: 2, Z: 3) on the support:
+        """
+        return [_IDS[self[j]] for j in self.support()]
+
+    def commutes(self, other):
+        return popcount((self.x & other.z) ^ (self.z & other.x)) % 2 == 0
+
+    def qubit_wise_commutes(self, other):
+        return (self.mask & other.mask & ((self.x ^ other.x) | (self.z ^ other.z))) == 0
+
+    def multiply(self, other):
+        """
+        :return (phase, pauli) such that self * other = phase * pauli:
+        """
+        x = self.x ^ other.x
+        z = self.z ^ other.z
+        power = self.n_y + other.n_y - popcount(x & z) + 2 * popcount(self.z & other.x)
+        return 1j ** (power % 4), PauliString(x, z, max(self.nqubit, other.nqubit))
+
+    def tensor(self, other):
+        """
+        :return the Pauli string acting on the qubits of self followed by those of other:
+        """
+        return PauliString(self.x | other.x << self.nqubit, self.z | other.z << self.nqubit,
+                           self.nqubit + other.nqubit)
+
+    def to_operator_str(self):
+        """
+        :return the operator string of qulacs (ex. "X 0 Z 2"):
+        """
+        return " ".join([f'{self[j]} {j}' for j in self.support()])
+
+    def __eq__(self, other):
+        return isinstance(other, PauliString) and \
+            (self.x, self.z, self.nqubit) == (other.x, other.z, other.nqubit)
+
+    def __hash__(self):
+        return hash((self.x, self.z, self.nqubit))
+
+    def __repr__(self) -> str:
+        return self.to_str()
@@ -0,0 +1,315 @@
+from qwrapper.pauli import PauliString
+import numpy as np
+
+_WORD = 64
+_WORD_MASK = (1 << _WORD) - 1
+
+
+def nwords(nqubit):
+    return max(1, (nqubit + _WORD - 1) // _WORD)
+
+
+def pack(value, count):
+    """
+    :return the integer value split into count uint64 words (little-endian):
+    """
+    return np.array([(value >> (_WORD * w)) & _WORD_MASK for w in range(count)], dtype=np.uint64)
+
+
+def unpack(words):
+    result = 0
+    for w, word in enumerate(words):
+        result |= int(word) << (_WORD * w)
+    return result
+
+
+def coeff_array(coeffs):
+    """
+    :return coeffs as a complex128 array if any of them is complex, otherwise as a float64 array:
+    """
+    coeffs = np.asarray(coeffs)
+    if np.iscomplexobj(coeffs):
+        return coeffs.astype(np.complex128, copy=False)
+    return coeffs.astype(np.float64, copy=False)
+
+
+class PauliSum:
+    """
+    Columnar store of sum_k signs[k] coeffs[k] P_k. The Pauli strings are packed into
+    (nterms x nwords) uint64 tables of X and Z bits (j-th bit corresponds to j-th qubit).
+    """
+
+    def __init__(self, coeffs, x, z, nqubit, signs=None):
+        self.coeffs = coeff_array(coeffs)
+        self.x = np.asarray(x, dtype=np.uint64).reshape(len(self.coeffs), nwords(nqubit))
+        self.z = np.asarray(z, dtype=np.uint64).reshape(len(self.coeffs), nwords(nqubit))
+        if signs is None:
+            signs = np.ones(len(self.coeffs))
+        self.signs = np.asarray(signs, dtype=np.int8)
+        self.nqubit = nqubit
+        self._paulis = None
+
+    @classmethod
+    def from_paulis(cls, hs, paulis, nqubit, signs=None):
+        """
+        :param hs: coefficients of the terms
+        :param paulis: PauliObservable, PauliString or Pauli string (ex. "XIZ") of the terms
+        :param signs: signs of the terms, multiplied by those of PauliObservable
+        """
+        count = nwords(nqubit)
+        x = np.zeros((len(paulis), count), dtype=np.uint64)
+        z = np.zeros((len(paulis), count), dtype=np.uint64)
+        results = np.ones(len(paulis), dtype=np.int8)
+        if signs is not None:
+            results[:] = signs
+        for k, p in enumerate(paulis):
+            if isinstance(p, str):
+                p = PauliString.from_str(p)
+            if not isinstance(p, PauliString):
+                results[k] *= p.sign
+                p = p.pauli
+            if p.nqubit != nqubit:
+                raise AttributeError(f'{p.to_str()} does not act on {nqubit} qubits')
+            x[k] = pack(p.x, count)
+            z[k] = pack(p.z, count)
+        return PauliSum(coeff_array(hs).reshape(len(paulis)), x, z, nqubit, results)
+
+    @property
+    def nterms(self):
+        return len(self.coeffs)
+
+    @property
+    def nwords(self):
+        return self.x.shape[1]
+
+    def signed_coeffs(self):
+        return self.coeffs * self.signs
+
+    def set_coeffs(self, coeffs):
+        self.coeffs = coeff_array(coeffs).reshape(self.nterms)
+
+    def dot(self, values, indices=None):
+        """
+        :param values: values of the Pauli strings (of the terms at indices if given)
+        :return sum_k signs[k] coeffs[k] values[k]:
+        """
+        coeffs = self.signed_coeffs()
+        if indices is not None:
+            coeffs = coeffs[indices]
+        return np.dot(coeffs, np.asarray(values)).item()
+
+    def norm(self, indices=None):
+        """
+        :return sum_k |coeffs[k]| (over the terms at indices if given):
+        """
+        coeffs = self.coeffs if indices is None else self.coeffs[indices]
+        return float(np.sum(np.abs(coeffs)))
+
+    def pauli(self, k) -> PauliString:
+        return PauliString(unpack(self.x[k]), unpack(self.z[k]), self.nqubit)
+
+    def paulis(self) -> [PauliString]:
+        """
+        :return the Pauli strings, which are built once since the tables are not modified in place:
+        """
+        if self._paulis is None:
+            self._paulis = [self.pauli(k) for k in range(self.nterms)]
+        return self._paulis
+
+    def lam(self):
+        return np.sum(self.coeffs).item()
+
+    def copy(self):
+        return PauliSum(self.coeffs.copy(), self.x.copy(), self.z.copy(), self.nqubit, self.signs.copy())
+
+    def simplify(self, atol=0):
+        """
+        Merge the duplicated Pauli strings, keeping the order of their first appearance,
+        and remove the terms whose merged coefficient is not larger than atol.
+        """
+        if self.nterms == 0:
+            return self.copy()
+        keys = np.concatenate([self.x, self.z], axis=1)
+        _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        signed = self.signed_coeffs()
+        totals = np.bincount(inverse, weights=signed.real, minlength=len(first))
+        if np.iscomplexobj(signed):
+            totals = totals + 1j * np.bincount(inverse, weights=signed.imag, minlength=len(first))
+        order = np.argsort(first, kind="stable")
+        first = first[order]
+        totals = totals[order]
+        keep = np.abs(totals) > atol
+        first = first[keep]
+        totals = totals[keep]
+        if np.iscomplexobj(totals):
+            return PauliSum(totals, self.x[first], self.z[first], self.nqubit)
+        return PauliSum(np.abs(totals), self.x[first], self.z[first], self.nqubit,
+                        np.where(totals < 0, -1, 1))
+
+    def drop_small(self, tol):
+        """
+        :return PauliSum without the terms whose absolute coefficients are not larger than tol:
+        """
+        keep = np.abs(self.coeffs) > tol
+        return PauliSum(self.coeffs[keep], self.x[keep], self.z[keep], self.nqubit, self.signs[keep])
+
+    def tensor(self, ancilla: PauliString):
+        """
+        :return PauliSum whose Pauli strings act on the qubits of self followed by those of ancilla:
+        """
+        nqubit = self.nqubit + ancilla.nqubit
+        count = nwords(nqubit)
+        x = np.zeros((self.nterms, count), dtype=np.uint64)
+        z = np.zeros((self.nterms, count), dtype=np.uint64)
+        x[:, :self.nwords] = self.x
+        z[:, :self.nwords] = self.z
+        x |= pack(ancilla.x << self.nqubit, count)
+        z |= pack(ancilla.z << self.nqubit, count)
+        return PauliSum(self.coeffs.copy(), x, z, nqubit, self.signs.copy())
+
+    def __mul__(self, other):
+        return PauliSum(self.coeffs * other, self.x.copy(), self.z.copy(), self.nqubit, self.signs.copy())
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __add__(self, other):
+        if self.nqubit != other.nqubit:
+            raise AttributeError(f'nqubit mismatch: {self.nqubit} and {other.nqubit}')
+        return PauliSum(np.concatenate([self.coeffs, other.coeffs]),
+                        np.concatenate([self.x, other.x]), np.concatenate([self.z, other.z]),
+                        self.nqubit, np.concatenate([self.signs, other.signs]))
+
+    def __len__(self):
+        return self.nterms
+
+
+_MAGIC = b"QWPSUM01"
+_HEADER_SIZE = 64
+
+
+def _layout(nterms, count, dtype=np.float64):
+    """
+    :return the byte offsets of coeffs, signs, x and z in the binary file:
+    """
+    coeffs = _HEADER_SIZE
+    signs = coeffs + np.dtype(dtype).itemsize * nterms
+    x = signs + (nterms + 7) // 8 * 8
+    z = x + 8 * nterms * count
+    return coeffs, signs, x, z
+
+
+def read_header(path):
+    """
+    :return (nqubit, nterms, nwords, identity, dtype of the coefficients) stored in the binary file:
+    """
+    with open(path, "rb") as f:
+        header = f.read(_HEADER_SIZE)
+    if header[:8] != _MAGIC:
+        raise AttributeError(f'{path} is not a PauliSum binary file')
+    nqubit, nterms, count = np.frombuffer(header, dtype=np.uint64, count=3, offset=8).tolist()
+    identity = np.frombuffer(header, dtype=np.float64, count=1, offset=32)[0].item()
+    is_complex = np.frombuffer(header, dtype=np.uint64, count=1, offset=40)[0]
+    return nqubit, nterms, count, identity, np.complex128 if is_complex else np.float64
+
+
+def save_binary(table: PauliSum, path, identity=0):
+    """
+    Write the table as a raw binary file (header, coeffs, signs, X and Z tables), which can be memory-mapped,
+    or as .npz when path ends with ".npz".
+    """
+    if path.endswith(".npz"):
+        np.savez(path, nqubit=table.nqubit, identity=identity, coeffs=table.coeffs, signs=table.signs,
+                 x=table.x, z=table.z)
+        return
+    header = np.zeros(_HEADER_SIZE, dtype=np.uint8)
+    header[:8] = np.frombuffer(_MAGIC, dtype=np.uint8)
+    header[8:32] = np.array([table.nqubit, table.nterms, table.nwords], dtype=np.uint64).view(np.uint8)
+    header[32:40] = np.array([identity], dtype=np.float64).view(np.uint8)
+    header[40:48] = np.array([np.iscomplexobj(table.coeffs)], dtype=np.uint64).view(np.uint8)
+    _, signs, x, _ = _layout(table.nterms, table.nwords, table.coeffs.dtype)
+    with open(path, "wb") as f:
+        f.write(header.tobytes())
+        f.write(np.ascontiguousarray(table.coeffs).tobytes())
+        f.write(np.ascontiguousarray(table.signs, dtype=np.int8).tobytes())
+        f.write(bytes(x - signs - table.nterms))
+        f.write(np.ascontiguousarray(table.x, dtype=np.uint64).tobytes())
+        f.write(np.ascontiguousarray(table.z, dtype=np.uint64).tobytes())
+
+
+def load_binary(path, mmap=True):
+    """
+    :param mmap: map the arrays of the raw binary file lazily (copy-on-write) instead of reading them
+    :return (PauliSum, identity):
+    """
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            table = PauliSum(data["coeffs"], data["x"], data["z"], int(data["nqubit"]), data["signs"])
+            return table, float(data["identity"])
+    nqubit, nterms, count, identity, dtype = read_header(path)
+    offsets = _layout(nterms, count, dtype)
+    shapes = [(nterms,), (nterms,), (nterms, count), (nterms, count)]
+    dtypes = [dtype, np.int8, np.uint64, np.uint64]
+    arrays = []
+    for offset, shape, dtype in zip(offsets, shapes, dtypes):
+        if nterms == 0:
+            arrays.append(np.zeros(shape, dtype=dtype))
+        elif mmap:
+            arrays.append(np.memmap(path, dtype=dtype, mode="c", offset=offset, shape=shape))
+        else:
+            arrays.append(np.fromfile(path, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape))
+    coeffs, signs, x, z = arrays
+    return PauliSum(coeffs, x, z, nqubit, signs), identity
+
+
+def iter_binary_chunks(path, chunk_size):
+    """
+    :return iterator of PauliSum holding at most chunk_size terms of the raw binary file:
+    """
+    nqubit, nterms, count, _, dtype = read_header(path)
+    if nterms == 0:
+        return
+    offsets = _layout(nterms, count, dtype)
+    coeffs = np.memmap(path, dtype=dtype, mode="r", offset=offsets[0], shape=(nterms,))
+    signs = np.memmap(path, dtype=np.int8, mode="r", offset=offsets[1], shape=(nterms,))
+    x = np.memmap(path, dtype=np.uint64, mode="r", offset=offsets[2], shape=(nterms, count))
+    z = np.memmap(path, dtype=np.uint64, mode="r", offset=offsets[3], shape=(nterms, count))
+    for start in range(0, nterms, chunk_size):
+        end = min(start + chunk_size, nterms)
+        yield PauliSum(np.array(coeffs[start:end]), np.array(x[start:end]), np.array(z[start:end]), nqubit,
+                       np.array(signs[start:end]))
+
+
+def iter_text_chunks(path, chunk_size):
+    """
+    :return iterator of PauliSum holding at most chunk_size terms of the text file written by Hamiltonian.save:
+    """
+    hs = []
+    p_strings = []
+    signs = []
+    with open(path) as f:
+        for l in f:
+            h, p_string, sign = l.rstrip().split('\t')
+            hs.append(float(h))
+            p_strings.append(p_string)
+            signs.append(int(sign))
+            if len(hs) == chunk_size:
+                yield PauliSum.from_paulis(hs, p_strings, len(p_string), signs)
+                hs, p_strings, signs = [], [], []
+    if len(hs) != 0:
+        yield PauliSum.from_paulis(hs, p_strings, len(p_strings[0]), signs)
+
+
+def is_binary(path):
+    with open(path, "rb") as f:
+        return f.read(len(_MAGIC)) == _MAGIC
+
+
+def iter_chunks(path, chunk_size):
+    """
+    :return iterator of PauliSum chunks of a raw binary or text file:
+    """
+    if is_binary(path):
+        return iter_binary_chunks(path, chunk_size)
+    return iter_text_chunks(path, chunk_size)
@@ -0,0 +1,132 @@
+from contextlib import contextmanager
+import functools
+import threading
+import time
+
+_monitors = []
+
+
+class Monitor:
+    """
+    Receiver of the instrumentation events, registered by add_monitor.
+    """
+
+    def on_phase(self, phase, owner, elapsed):
+        """
+        :param phase: name of the timed call (ex. "simulate", "sample", "exact_value")
+        :param owner: class name of the object making the call (ex. "QulacsCircuit")
+        :param elapsed: wall-clock seconds
+        """
+        pass
+
+    def on_count(self, name, value):
+        """
+        :param name: name of the counter (ex. "shots", "state_copies", "gate.CNOT")
+        """
+        pass
+
+
+class Profiler(Monitor):
+    """
+    Monitor aggregating the number of calls and the time of each phase, and the counters.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases = {}
+        self.counts = {}
+
+    def reset(self):
+        with self._lock:
+            self.phases = {}
+            self.counts = {}
+
+    def on_phase(self, phase, owner, elapsed):
+        with self._lock:
+            entry = self.phases.setdefault((phase, owner), [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def on_count(self, name, value):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    def report(self):
+        """
+        :return {"phases": [{"phase", "owner", "calls", "seconds"}, ...] in descending order of seconds,
+                 "counts": {name: value}}:
+        """
+        with self._lock:
+            phases = [{"phase": phase, "owner": owner, "calls": calls, "seconds": seconds}
+                      for (phase, owner), (calls, seconds) in self.phases.items()]
+            counts = dict(sorted(self.counts.items()))
+        phases.sort(key=lambda entry: -entry["seconds"])
+        return {"phases": phases, "counts": counts}
+
+    def summary(self):
+        report = self.report()
+        lines = [f'{"phase":<20}{"owner":<28}{"calls":>10}{"seconds":>12}']
+        for entry in report["phases"]:
+            lines.append(f'{entry["phase"]:<20}{entry["owner"]:<28}{entry["calls"]:>10}{entry["seconds"]:>12.6f}')
+        for name, value in report["counts"].items():
+            lines.append(f'{name:<48}{value:>10}')
+        return "\n".join(lines)
+
+
+def add_monitor(monitor: Monitor):
+    _monitors.append(monitor)
+
+
+def remove_monitor(monitor: Monitor):
+    if monitor in _monitors:
+        _monitors.remove(monitor)
+
+
+def enabled():
+    return len(_monitors) != 0
+
+
+@contextmanager
+def profile(monitor: Monitor = None):
+    """
+    Enable the instrumentation within the block.
+
+    with profile() as profiler:
+        hamiltonian.exact_value(qc)
+    print(profiler.summary())
+    """
+    if monitor is None:
+        monitor = Profiler()
+    add_monitor(monitor)
+    try:
+        yield monitor
+    finally:
+        remove_monitor(monitor)
+
+
+def count(name, value=1):
+    for monitor in list(_monitors):
+        monitor.on_count(name, value)
+
+
+def timed(phase):
+    """
+    Decorator of a method reporting its time as the phase; only a list check is added while disabled.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            if not _monitors:
+                return fn(self, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(self, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                for monitor in list(_monitors):
+                    monitor.on_phase(phase, type(self).__name__, elapsed)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,78 @@
+from qwrapper.circuit import QWrapper
+from qwrapper.obs import Hamiltonian
+from qwrapper.sampler import AliasImportantSampler
+from qwrapper.trotter import add_rotations, evolve_vector
+import numpy as np
+
+
+class QDrift:
+    """
+    qDRIFT random compilation of exp(-i H t): nsamples terms are drawn with probabilities |h_k| / lambda,
+    and each of them is evolved for lambda t / nsamples (lambda = sum_k |h_k|).
+    """
+
+    def __init__(self, hamiltonian: Hamiltonian, t, nsamples, seed=None):
+        """
+        :param seed: seed or np.random.Generator of the term sampling
+        """
+        table = hamiltonian.pauli_sum
+        self.paulis = table.paulis()
+        self.coeffs = table.signed_coeffs()
+        self.t = t
+        self.nsamples = nsamples
+        self.lam = float(np.sum(np.abs(self.coeffs)))
+        self.sampler = AliasImportantSampler(np.abs(self.coeffs), seed)
+
+    @property
+    def tau(self):
+        return self.lam * self.t / self.nsamples
+
+    def sample_sequence(self):
+        """
+        :return list of (PauliString, theta) standing for the product of exp(-i theta P) from the first:
+        """
+        return self.sample_sequences(1)[0]
+
+    def sample_sequences(self, ncircuits):
+        """
+        Draw the terms of ncircuits independent circuits at once.
+        """
+        indices = self.sampler.sample_indices(ncircuits * self.nsamples).reshape(ncircuits, self.nsamples)
+        return [self._to_sequence(row) for row in indices]
+
+    def _to_sequence(self, indices):
+        # runs of the same term are merged into a single rotation
+        starts = np.concatenate([[0], np.nonzero(np.diff(indices))[0] + 1])
+        counts = np.diff(np.append(starts, len(indices)))
+        signs = np.sign(self.coeffs)
+        return [(self.paulis[k], float(signs[k] * count * self.tau))
+                for k, count in zip(indices[starts].tolist(), counts.tolist())]
+
+    def add_circuit(self, qc: QWrapper, sequence=None):
+        """
+        :param sequence: sequence returned by sample_sequence; a new one is sampled by default
+        """
+        if sequence is None:
+            sequence = self.sample_sequence()
+        add_rotations(qc, sequence)
+
+    def evolve(self, vector, sequence=None):
+        """
+        :param vector: state vector whose j-th bit of the index corresponds to j-th qubit
+        :return the state vector evolved by a randomized circuit without building gates:
+        """
+        if sequence is None:
+            sequence = self.sample_sequence()
+        return evolve_vector(vector, sequence)
+
+    def map(self, fn, ncircuits, executor=None):
+        """
+        Evaluate fn(sequence) for ncircuits independent randomized circuits, e.g. to average their observables.
+
+        :param fn: function taking a sequence (module-level to be sent to ProcessExecutor)
+        :param executor: qwrapper.executor.Executor evaluating the circuits in parallel
+        """
+        sequences = self.sample_sequences(ncircuits)
+        if executor is None:
+            return [fn(sequence) for sequence in sequences]
+        return executor.map(fn, sequences)
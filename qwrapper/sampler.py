@@ -48,3 +48,74 @@ class DefaultImportantSampler(ImportantSampler):
             else:
                 end = middle
         return end
+
+
+class AliasImportantSampler(ImportantSampler):
+    """
+    Walker's alias method (Vose's construction): the tables are built once in O(n),
+    and then each index is drawn in O(1) with two uniform numbers.
+    """
+
+    def __init__(self, coeffs, seed=None):
+        """
+        :param seed: seed or np.random.Generator of the draws
+        """
+        self.rng = np.random.default_rng(seed)
+        self.set_coeffs(coeffs)
+
+    def set_coeffs(self, coeffs):
+        """
+        :param coeffs: non-negative finite weights of the indices
+        """
+        self.coeffs = self._check(np.array(coeffs, dtype=float))
+        self._tables = None
+
+    def update(self, indices, values):
+        """
+        Replace the coefficients at indices; the tables are rebuilt before the next draw.
+        """
+        self.coeffs[indices] = self._check(np.asarray(values, dtype=float))
+        self._tables = None
+
+    @classmethod
+    def _check(cls, coeffs):
+        if not np.all(np.isfinite(coeffs)) or np.any(coeffs < 0):
+            raise ValueError('the coefficients have to be non-negative and finite.')
+        return coeffs
+
+    def sample_index(self):
+        return int(self.sample_indices(1)[0])
+
+    def sample_indices(self, count):
+        prob, alias = self._get_tables()
+        columns = self.rng.integers(0, len(prob), size=count)
+        accepted = self.rng.random(count) < prob[columns]
+        return np.where(accepted, columns, alias[columns])
+
+    def _get_tables(self):
+        if self._tables is None:
+            self._tables = self._build_tables()
+        return self._tables
+
+    def _build_tables(self):
+        n = len(self.coeffs)
+        total = np.sum(self.coeffs)
+        if total == 0:
+            raise ValueError('all the coefficients are zero.')
+        prob = self.coeffs * n / total
+        alias = np.arange(n)
+        small = np.nonzero(prob < 1)[0]
+        large = np.nonzero(prob >= 1)[0]
+        # pair the small and the large columns in bulk; a large column whose remaining
+        # probability falls below 1 is paired again in the next round
+        while len(small) != 0 and len(large) != 0:
+            k = min(len(small), len(large))
+            alias[small[:k]] = large[:k]
+            prob[large[:k]] -= 1 - prob[small[:k]]
+            paired = large[:k]
+            small = np.concatenate([small[k:], paired[prob[paired] < 1]])
+            large = np.concatenate([large[k:], paired[prob[paired] >= 1]])
+        # the rest is 1 up to the rounding errors
+        prob[small] = 1
+        prob[large] = 1
+        return prob, alias
@@ -0,0 +1,121 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
+from qwrapper.circuit import Future
+import asyncio
+import multiprocessing
+import threading
+
+
+class JobFuture(Future):
+    """
+    Future of a job running on JobScheduler. It keeps get() of qwrapper.circuit.Future and mirrors
+    concurrent.futures.Future; it can also be awaited in asyncio.
+    """
+
+    def __init__(self, future):
+        super().__init__(future.result)
+        self.future = future
+        self.factor = 1
+
+    def get(self, timeout=None):
+        """
+        :return the result scaled by factor like get() of the synchronous futures:
+        """
+        result = self.future.result(timeout)
+        if self.factor == 1:
+            return result
+        return self.factor * result
+
+    def __mul__(self, other):
+        self.factor = self.factor * other
+        return self
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def exception(self, timeout=None):
+        return self.future.exception(timeout)
+
+    def done(self):
+        return self.future.done()
+
+    def running(self):
+        return self.future.running()
+
+    def cancel(self):
+        return self.future.cancel()
+
+    def cancelled(self):
+        return self.future.cancelled()
+
+    def add_done_callback(self, fn):
+        self.future.add_done_callback(lambda _: fn(self))
+
+    def __await__(self):
+        return asyncio.wrap_future(self.future).__await__()
+
+
+class JobScheduler:
+    """
+    Bounded worker pool; threads suit qulacs (the GIL is released during the simulation) and
+    processes suit qiskit. submit blocks while max_pending jobs are in flight.
+    The processes are spawned rather than forked, since the parent already runs threads;
+    the submitted function and its arguments have to be picklable.
+    """
+
+    def __init__(self, max_workers=None, processes=False, max_pending=None):
+        self.processes = processes
+        if processes:
+            self._pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._pending = None
+        if max_pending is not None:
+            self._pending = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, fn, *args) -> JobFuture:
+        if self._pending is not None:
+            self._pending.acquire()
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            if self._pending is not None:
+                self._pending.release()
+            raise
+        if self._pending is not None:
+            future.add_done_callback(lambda _: self._pending.release())
+        return JobFuture(future)
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+_schedulers = {}
+_lock = threading.Lock()
+
+
+def get_scheduler(processes=False) -> JobScheduler:
+    """
+    :return the shared scheduler used by get_async_samples of the circuits:
+    """
+    with _lock:
+        if processes not in _schedulers:
+            _schedulers[processes] = JobScheduler(processes=processes)
+        return _schedulers[processes]
+
+
+def set_scheduler(scheduler: JobScheduler):
+    with _lock:
+        _schedulers[scheduler.processes] = scheduler
+
+
+def gather(futures, timeout=None):
+    """
+    Wait for all the futures and return their results in order.
+    """
+    futures = list(futures)
+    wait([f.future for f in futures], timeout=timeout)
+    return [f.result(0) for f in futures]
+
+
+async def gather_async(futures):
+    return await asyncio.gather(*[asyncio.wrap_future(f.future) for f in futures])
@@ -0,0 +1,92 @@
+from qwrapper.util import QUtil
+from qwrapper.pauli import PauliString
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import LinearOperator
+import numpy as np
+
+
+def pauli_masks(p_string):
+    """
+    :param p_string: PauliString or Pauli string whose j-th character acts on j-th qubit
+    :return (x_mask, z_mask, number of Y): P = i^{n_y} X^{x_mask} Z^{z_mask}
+    """
+    if not isinstance(p_string, PauliString):
+        p_string = PauliString.from_str(p_string)
+    return p_string.x, p_string.z, p_string.n_y
+
+
+def pauli_phases(z_mask, n_y, indices):
+    """
+    :return the phases p(j) such that P|j> = p(j)|j ^ x_mask>:
+    """
+    signs = 1 - 2 * QUtil.bit_parity(indices & np.uint64(z_mask)).astype(np.int64)
+    return (1j ** (n_y % 4)) * signs
+
+
+def _group_by_x_mask(hs, p_strings):
+    groups = {}
+    for h, p_string in zip(hs, p_strings):
+        x_mask, z_mask, n_y = pauli_masks(p_string)
+        groups.setdefault(x_mask, []).append((h, z_mask, n_y))
+    return groups
+
+
+def _diagonal(terms, indices):
+    result = np.zeros(len(indices), dtype=np.complex128)
+    for h, z_mask, n_y in terms:
+        result += h * pauli_phases(z_mask, n_y, indices)
+    return result
+
+
+def to_sparse_matrix(hs, p_strings, nqubit, identity=0):
+    """
+    Build sum_k hs[k] P_k + identity as a CSR matrix without Kronecker products.
+    Terms sharing the same X mask share the sparsity pattern, so that they are summed up first.
+    """
+    dim = 1 << nqubit
+    indices = np.arange(dim, dtype=np.uint64)
+    rows = []
+    data = []
+    for x_mask, terms in _group_by_x_mask(hs, p_strings).items():
+        rows.append(indices ^ np.uint64(x_mask))
+        data.append(_diagonal(terms, indices))
+    if identity != 0:
+        rows.append(indices)
+        data.append(np.full(dim, identity, dtype=np.complex128))
+    if len(rows) == 0:
+        return csr_matrix((dim, dim), dtype=np.complex128)
+    columns = np.tile(indices, len(rows)).astype(np.int64)
+    matrix = csr_matrix((np.concatenate(data), (np.concatenate(rows).astype(np.int64), columns)),
+                        shape=(dim, dim))
+    matrix.eliminate_zeros()
+    return matrix
+
+
+class PauliSumOperator(LinearOperator):
+    """
+    Matrix-free sum_k hs[k] P_k + identity; only O(2^nqubit) memory is used to apply it to a vector.
+    """
+
+    def __init__(self, hs, p_strings, nqubit, identity=0):
+        dim = 1 << nqubit
+        super().__init__(dtype=np.complex128, shape=(dim, dim))
+        self.hs = hs
+        self.p_strings = p_strings
+        self.nqubit = nqubit
+        self.groups = _group_by_x_mask(hs, p_strings)
+        self.identity = identity
+        self.indices = np.arange(dim, dtype=np.uint64)
+
+    def _matvec(self, v):
+        v = np.asarray(v).reshape(-1)
+        result = self.identity * v.astype(np.complex128)
+        for x_mask, terms in self.groups.items():
+            flipped = self.indices ^ np.uint64(x_mask)
+            result += _diagonal(terms, flipped) * v[flipped]
+        return result
+
+    def _adjoint(self):
+        # the Pauli strings are hermitian, so only the coefficients are conjugated
+        if not np.iscomplexobj(self.hs) and not np.iscomplexobj(self.identity):
+            return self
+        return PauliSumOperator(np.conj(self.hs), self.p_strings, self.nqubit, np.conj(self.identity))
@@ -1,6 +1,7 @@
 from unittest import TestCase
 from qwrapper.circuit import *
 import math
+import numpy as np
 
 
 class TestQulacsCircuit(TestCase):
@@ -29,3 +30,153 @@ class TestQulacsCircuit(TestCase):
         self.assertAlmostEquals(1 / math.sqrt(2), vector[0])
         self.assertAlmostEquals(1 / math.sqrt(2), vector[4])
         self.assertAlmostEquals(1 / math.sqrt(2), vector[7])
+
+    def test_post_select(self):
+        qc = QulacsCircuit(3)
+        qc.h(0)
+        qc.h(1)
+        qc.cnot(1, 2)
+        qc.post_select(2, 1)
+        qc.post_select(0, 0)
+        vector = qc.get_state_vector()
+        self.assertAlmostEqual(1, abs(vector[6]))
+        self.assertAlmostEqual(1, sum(abs(v) ** 2 for v in vector))
+
+        vector = [0.5, 0.5, 0.5, 0.5]
+        results = QWrapper.execute_post_selects(vector, {0: 1}, 2)
+        self.assertAlmostEqual(0, results[0])
+        self.assertAlmostEqual(1 / math.sqrt(2), results[2])
+        self.assertAlmostEqual(1 / math.sqrt(2), results[3])
+        self.assertEqual(0.5, vector[2])
+        with self.assertRaises(ZeroDivisionError):
+            QWrapper.execute_post_selects([1, 0, 0, 0], {0: 1}, 2)
+
+    def test_parametric(self):
+        from qwrapper.obs import PauliObservable, Hamiltonian
+        from qwrapper.operator import PauliTimeEvolution
+
+        def ansatz(qc, params):
+            qc.h(0)
+            qc.rx(params[0], 1)
+            qc.ry(params[1], 2)
+            qc.cnot(0, 2)
+            qc.rz(2 * params[0], 0)
+            PauliTimeEvolution(PauliObservable("XYZ", -1), params[1]).add_circuit(qc)
+
+        hamiltonian = Hamiltonian([0.3, 0.6], [PauliObservable("ZXI"), PauliObservable("YIZ")], 3)
+        qc = ParametricQulacsCircuit(3)
+        ansatz(qc, [Parameter(0), Parameter(1)])
+        self.assertEqual(2, qc.nparams)
+        batch = [[0.1, 0.2], [0.5, -0.3], [1.2, 0.7]]
+        values = hamiltonian.batch_exact_values(qc, batch)
+        for params, value in zip(batch, values):
+            expected = QulacsCircuit(3)
+            ansatz(expected, params)
+            self.assertAlmostEqual(hamiltonian.exact_value(expected), value)
+
+    def test_fusion(self):
+        from qwrapper.obs import PauliObservable
+        from qwrapper.operator import PauliTimeEvolution
+
+        qc = QulacsCircuit(4)
+        qc2 = QulacsCircuit(4)
+        qc2.set_fusion(2)
+        for c in [qc, qc2]:
+            c.h(0)
+            c.h(3)
+            for _ in range(5):
+                for p_string in ["ZZII", "IZZI", "IIZZ", "XIII", "IXII"]:
+                    PauliTimeEvolution(PauliObservable(p_string), 0.1).add_circuit(c)
+        np.testing.assert_array_almost_equal(qc.get_state_vector(), qc2.get_state_vector())
+        self.assertLess(qc2._get_circuit().get_gate_count(), qc2.circuit.get_gate_count())
+        qc2.x(1)
+        qc.x(1)
+        np.testing.assert_array_almost_equal(qc.get_state_vector(), qc2.get_state_vector())
+        # replacing a gate keeps the gate count, but the fused circuit has to be rebuilt
+        from qulacs.gate import Y
+        qc2.replace_gate(0, Y(0))
+        qc.replace_gate(0, Y(0))
+        np.testing.assert_array_almost_equal(qc.get_state_vector(), qc2.get_state_vector())
+
+    def test_checkpoint(self):
+        qc = QulacsCircuit(3)
+        qc.h(0)
+        qc.cnot(0, 1)
+        qc.ry(0.3, 2)
+        qc.checkpoint()
+        qc.rx(0.2, 1)
+        child = qc.copy()
+        child.h(2)
+        qc.ry(0.4, 0)
+        qc.checkpoint()
+        child.cnot(1, 2)
+        for c in [qc, child]:
+            expected = QulacsCircuit(3)
+            expected.circuit = c.circuit.copy()
+            np.testing.assert_array_almost_equal(expected.get_state_vector(), c.get_state_vector())
+        # the second checkpoint of qc is not a prefix of the child
+        self.assertEqual(3, child._find_checkpoint()[0])
+        self.assertEqual(5, qc._find_checkpoint()[0])
+
+        qc.checkpoints.max_bytes = 16 * 8
+        qc.checkpoint()
+        self.assertEqual(1, len(qc.checkpoints.keys()))
+
+        # the checkpoints are not replayed on a new circuit
+        qc = QulacsCircuit(2)
+        qc.x(0)
+        qc.x(1)
+        qc.checkpoint()
+        qc.circuit = QCircuit(2)
+        qc.h(0)
+        qc.h(1)
+        qc.z(0)
+        np.testing.assert_array_almost_equal([0.5, -0.5, 0.5, -0.5], qc.get_state_vector())
+
+        # the lineage keeps only the ancestors having a recorded state
+        for _ in range(200):
+            qc = qc.copy()
+        self.assertEqual(1, len(qc._lineage))
+        self.assertEqual({}, QulacsCircuit(2).copy()._lineage)
+
+    def test_state_memo(self):
+        qc = QulacsCircuit(3)
+        qc.h(0)
+        state = qc._get_evolved_state()
+        self.assertIs(state, qc._get_evolved_state())
+        qc.get_state().set_zero_state()
+        self.assertAlmostEqual(1 / math.sqrt(2), qc.get_state_vector()[1])
+        qc.x(1)
+        self.assertIsNot(state, qc._get_evolved_state())
+        self.assertAlmostEqual(1 / math.sqrt(2), qc.get_state_vector()[3])
+
+        qc2 = QulacsCircuit(3)
+        qc2._get_evolved_state()
+        try:
+            set_memo_limit(16 * 8)
+            self.assertIsNone(qc._memo)
+            self.assertIsNotNone(qc2._memo)
+        finally:
+            set_memo_limit(1 << 30)
+
+    def test_state_memo_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        def run(k):
+            qc = QulacsCircuit(4)
+            qc.h(k % 4)
+            qc.checkpoint()
+            for _ in range(20):
+                qc.x(k % 4)
+                qc.get_state_vector()
+                qc.copy().get_state_vector()
+            return abs(qc.get_state_vector()[0])
+
+        try:
+            # a small budget makes the threads evict the memos of each other
+            set_memo_limit(16 * 16 * 3)
+            with ThreadPoolExecutor(8) as pool:
+                results = list(pool.map(run, range(64)))
+        finally:
+            set_memo_limit(1 << 30)
+        np.testing.assert_array_almost_equal(np.full(64, 1 / math.sqrt(2)), results)
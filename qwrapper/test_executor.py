@@ -0,0 +1,54 @@
+from unittest import TestCase
+from qwrapper.executor import SerialExecutor, ThreadExecutor, ProcessExecutor, CircuitFactory
+from qwrapper.obs import PauliObservable, Hamiltonian
+from qwrapper.measurement import MeasurementMethod
+from qwrapper.optimizer import Optimizer
+import numpy as np
+import random
+
+
+def build(qc, theta):
+    qc.h(0)
+    qc.ry(theta, 1)
+    qc.cnot(0, 2)
+
+
+def sample(item):
+    return CircuitFactory(3, "qulacs", build, (item,))().get_raw_samples(20).raw.tolist()
+
+
+def energy(params):
+    qc = CircuitFactory(3, "qulacs", build, (params[0],))()
+    return PauliObservable("XZI").exact_value(qc) + params[1] ** 2
+
+
+class TestExecutor(TestCase):
+    def test_map(self):
+        expected = SerialExecutor(seed=3).map(sample, [0.1, 0.2, 0.3])
+        for executor in [ThreadExecutor(2, seed=3), ProcessExecutor(2, seed=3)]:
+            with executor:
+                self.assertEqual(expected, executor.map(sample, [0.1, 0.2, 0.3]))
+
+    def test_gradient_and_measurement(self):
+        with ProcessExecutor(2) as executor:
+            x = np.array([0.4, 0.5])
+            np.testing.assert_array_almost_equal(Optimizer.gradient_num_diff(x, energy, 1e-4),
+                                                 Optimizer.gradient_num_diff(x, energy, 1e-4, executor=executor))
+            hamiltonian = Hamiltonian([0.5, 0.2], [PauliObservable("XZI"), PauliObservable("ZIZ")], 3)
+            prepare = CircuitFactory(3, "qulacs", build, (0.4,))
+            expected = MeasurementMethod(hamiltonian).exact_value(prepare)
+            self.assertAlmostEqual(expected, MeasurementMethod(hamiltonian, executor=executor).exact_value(prepare))
+            value = MeasurementMethod(hamiltonian, executor=executor).get_value(prepare, 20000)
+            self.assertAlmostEqual(expected, value, delta=0.05)
+
+    def test_serial_map_keeps_seeds(self):
+        hamiltonian = Hamiltonian([0.5, 0.2], [PauliObservable("XZI"), PauliObservable("ZIZ")], 3)
+        prepare = CircuitFactory(3, "qulacs", build, (0.4,))
+        method = MeasurementMethod(hamiltonian)
+        expected = method.get_value(prepare, 100, seed=5)
+        self.assertEqual(expected, method.get_value(prepare, 100, seed=5))
+        state = random.getstate(), np.random.get_state()[1].copy()
+        SerialExecutor(seed=3).map(sample, [0.1, 0.2])
+        self.assertEqual(state[0], random.getstate())
+        np.testing.assert_array_equal(state[1], np.random.get_state()[1])
+        self.assertEqual(expected, method.get_value(prepare, 100, seed=5))
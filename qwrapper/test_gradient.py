@@ -0,0 +1,56 @@
+from unittest import TestCase
+from qwrapper.circuit import QulacsCircuit, ParametricQulacsCircuit, Parameter
+from qwrapper.obs import PauliObservable, Hamiltonian
+from qwrapper.operator import PauliTimeEvolution
+from qwrapper.gradient import NumericalGradient, ParameterShiftGradient, AdjointGradient
+from qwrapper.optimizer import AdamOptimizer
+import numpy as np
+
+
+def ansatz(qc, params):
+    qc.h(0)
+    qc.rx(params[0], 1)
+    qc.cnot(0, 1)
+    qc.ry(params[1], 2)
+    qc.cnot(1, 2)
+    PauliTimeEvolution(PauliObservable("XZY", -1), params[2]).add_circuit(qc)
+    qc.rz(params[3], 0)
+
+
+class TestGradient(TestCase):
+    def setUp(self):
+        self.hamiltonian = Hamiltonian([0.3, 0.6, 0.2], [PauliObservable("ZXI"), PauliObservable("YIZ"),
+                                                         PauliObservable("XYX")], 3)
+
+        def function(params):
+            qc = QulacsCircuit(3)
+            ansatz(qc, params)
+            return self.hamiltonian.exact_value(qc)
+
+        self.function = function
+        self.qc = ParametricQulacsCircuit(3)
+        ansatz(self.qc, [Parameter(k) for k in range(4)])
+
+    def test_gradient(self):
+        params = np.array([0.3, -0.4, 0.8, 0.2])
+        expected = NumericalGradient(self.function, 1e-6)(params)
+        np.testing.assert_array_almost_equal(expected, ParameterShiftGradient(self.function, [1, 1, 2, 1])(params),
+                                             decimal=5)
+        np.testing.assert_array_almost_equal(expected, AdjointGradient(self.qc, self.hamiltonian)(params), decimal=5)
+
+        self.qc.set_ref_state([0, 0, 0.6, 0, 0, 0, 0, 0.8])
+
+        def function(params):
+            qc = QulacsCircuit(3)
+            qc.set_ref_state([0, 0, 0.6, 0, 0, 0, 0, 0.8])
+            ansatz(qc, params)
+            return self.hamiltonian.exact_value(qc)
+
+        np.testing.assert_array_almost_equal(NumericalGradient(function, 1e-6)(params),
+                                             AdjointGradient(self.qc, self.hamiltonian)(params), decimal=5)
+
+    def test_optimize(self):
+        optimizer = AdamOptimizer(maxiter=10, monitors=[])
+        _, value, _ = optimizer.optimize(self.function, [0.3, -0.4, 0.8, 0.2],
+                                         AdjointGradient(self.qc, self.hamiltonian))
+        self.assertLess(value, self.function([0.3, -0.4, 0.8, 0.2]))
@@ -0,0 +1,70 @@
+from unittest import TestCase
+from qwrapper.grouping import GreedyGrouping, ColoringGrouping, qubit_wise_commute
+from qwrapper.allocation import allocate_shots, NeymanAllocator
+from qwrapper.executor import ThreadExecutor
+from qwrapper.obs import PauliObservable, Hamiltonian
+from qwrapper.measurement import GroupedMeasurementMethod
+from qwrapper.circuit import init_circuit
+
+
+class TestGrouping(TestCase):
+    def test_qubit_wise_commute(self):
+        self.assertTrue(qubit_wise_commute("XIZ", "XYI"))
+        self.assertFalse(qubit_wise_commute("XIZ", "ZYI"))
+
+    def test_group(self):
+        p_strings = ["XXI", "IXX", "ZZI", "IZZ", "XIX", "ZIZ"]
+        for grouping in [GreedyGrouping(), ColoringGrouping()]:
+            groups = grouping.group(p_strings)
+            self.assertEqual(2, len(groups))
+            self.assertEqual(list(range(6)), sorted(i for g in groups for i in g.indices))
+            for group in groups:
+                for i in group.indices:
+                    self.assertTrue(qubit_wise_commute(group.basis_string, p_strings[i]))
+
+    def test_group_wide(self):
+        # the masks span two words
+        p_strings = ["X" + "I" * 68 + "Z", "I" * 69 + "X", "Y" + "I" * 69, "X" + "Z" * 69]
+        groups = ColoringGrouping().group(p_strings)
+        self.assertEqual([[0, 3], [1, 2]], sorted(sorted(g.indices) for g in groups))
+
+    def test_allocate_shots(self):
+        self.assertEqual([34, 33, 33], list(allocate_shots([1, 1, 1], 100)))
+        self.assertEqual([91, 10, 1], list(allocate_shots([10, 1, 0], 102)))
+        self.assertEqual(7, sum(allocate_shots([0.3, 0.2, 0.1], 7)))
+
+
+class TestGroupedMeasurement(TestCase):
+    def test_get_value(self):
+        def prepare():
+            qc = init_circuit(3, "qulacs")
+            qc.h(0)
+            qc.x(1)
+            qc.h(2)
+            qc.s(2)
+            return qc
+
+        hamiltonian = Hamiltonian([0.5, 0.3, 0.2, 0.1],
+                                  [PauliObservable("XZI"), PauliObservable("XII", -1),
+                                   PauliObservable("IIY"), PauliObservable("XZY")], 3)
+        expected = hamiltonian.exact_value(prepare())
+        self.assertAlmostEqual(expected, hamiltonian.get_value(prepare(), 3000))
+        self.assertAlmostEqual(expected, GroupedMeasurementMethod(hamiltonian).get_value(prepare, 3000))
+        value, error = GroupedMeasurementMethod(hamiltonian).get_value_with_error(prepare, 3000)
+        self.assertAlmostEqual(expected, value)
+        self.assertAlmostEqual(0, error)
+        # the groups are measured in parallel over the adaptive rounds
+        with ThreadExecutor(2) as executor:
+            method = GroupedMeasurementMethod(hamiltonian, allocator=NeymanAllocator(), rounds=3, executor=executor)
+            value, error = method.get_value_with_error(prepare, 3000)
+        self.assertAlmostEqual(expected, value)
+        self.assertEqual(len(hamiltonian.get_groups()), len(method.variances))
+
+    def test_too_few_shots(self):
+        hamiltonian = Hamiltonian([0.5, 0.3], [PauliObservable("XI"), PauliObservable("ZI")], 2)
+        with self.assertRaises(ValueError):
+            hamiltonian.get_value(init_circuit(2, "qulacs"), 1)
+        with self.assertRaises(ValueError):
+            GroupedMeasurementMethod(hamiltonian).get_value(lambda: init_circuit(2, "qulacs"), 1)
+        with self.assertRaises(ValueError):
+            allocate_shots([1, 1, 1], 2)
@@ -1,6 +1,8 @@
 from unittest import TestCase
 from qwrapper.obs import Hamiltonian, PauliObservable
-from qwrapper.hamiltonian import compute_ground_state
+from qwrapper.hamiltonian import compute_ground_state, to_sparse_matrix_hamiltonian, to_linear_operator, \
+    HeisenbergModel
+import numpy as np
 
 
 class Test(TestCase):
@@ -12,3 +14,24 @@ class Test(TestCase):
         ge2 = compute_ground_state(hamiltonian)
 
         self.assertAlmostEquals(ge + 0.4, ge2)
+
+    def test_sparse(self):
+        hamiltonian = HeisenbergModel(6, magnetic=0.3)
+        hamiltonian._identity = 0.1
+        matrix = to_sparse_matrix_hamiltonian(hamiltonian).toarray()
+        expected = sum(h * p.to_matrix() for h, p in zip(hamiltonian.hs, hamiltonian.paulis)) + 0.1 * np.eye(64)
+        np.testing.assert_array_almost_equal(expected, matrix)
+
+        vector = np.random.rand(64) + 1j * np.random.rand(64)
+        np.testing.assert_array_almost_equal(matrix.dot(vector), to_linear_operator(hamiltonian).matvec(vector))
+
+        ge = compute_ground_state(hamiltonian, sparse=False)
+        self.assertAlmostEqual(ge, compute_ground_state(hamiltonian, sparse=True))
+        self.assertAlmostEqual(ge, compute_ground_state(hamiltonian, matrix_free=True))
+
+    def test_linear_operator_adjoint(self):
+        hamiltonian = Hamiltonian([0.4, 0.2j], [PauliObservable("XZ"), PauliObservable("YY", -1)], 2)
+        matrix = to_sparse_matrix_hamiltonian(hamiltonian).toarray()
+        vector = np.random.rand(4) + 1j * np.random.rand(4)
+        np.testing.assert_array_almost_equal(matrix.conj().T.dot(vector),
+                                             to_linear_operator(hamiltonian).H.matvec(vector))
@@ -0,0 +1,39 @@
+from unittest import TestCase
+from qwrapper.obs import PauliObservable, Hamiltonian
+from qwrapper.measurement import MeasurementMethod
+from qwrapper.allocation import NeymanAllocator, ProportionalAllocator
+from qwrapper.circuit import init_circuit
+
+
+class TestMeasurementMethod(TestCase):
+    def test_get_value_with_error(self):
+        def prepare():
+            qc = init_circuit(2, "qulacs")
+            qc.ry(0.7, 0)
+            qc.x(1)
+            return qc
+
+        hamiltonian = Hamiltonian([0.5, 0.3, 0.2], [PauliObservable("ZI"), PauliObservable("IZ"),
+                                                    PauliObservable("XZ", -1)], 2)
+        expected = hamiltonian.exact_value(prepare())
+        for allocator in [None, ProportionalAllocator(), NeymanAllocator()]:
+            method = MeasurementMethod(hamiltonian, allocator, rounds=3)
+            value, error = method.get_value_with_error(prepare, 10000, seed=1)
+            self.assertLess(abs(value - expected), 5 * error)
+            self.assertLess(error, 0.01)
+        # the second term is deterministic, so that the variance estimate is zero.
+        self.assertAlmostEqual(0, method.variances[1])
+        # the variances of the previous call do not steer the allocation
+        self.assertEqual(method.get_value(prepare, 1000, seed=1), method.get_value(prepare, 1000, seed=1))
+        self.assertEqual(3, len(method.get_values(prepare, 101)))
+
+    def test_too_few_shots(self):
+        hamiltonian = Hamiltonian([0.5, 0.3, 0.2], [PauliObservable("ZI"), PauliObservable("IZ"),
+                                                    PauliObservable("XZ", -1)], 2)
+        method = MeasurementMethod(hamiltonian, rounds=3)
+        with self.assertRaises(ValueError):
+            method.get_value(lambda: init_circuit(2, "qulacs"), 2)
+        # every pauli is measured even when the rounds are shorter than the number of the paulis
+        values, errors = method.get_values_with_errors(lambda: init_circuit(2, "qulacs"), 5)
+        self.assertAlmostEqual(0.5, values[0])
+        self.assertAlmostEqual(0.3, values[1])
@@ -2,6 +2,7 @@ from unittest import TestCase
 from qwrapper.circuit import init_circuit
 from qwrapper.obs import PauliObservable, Hamiltonian
 from qwrapper.obs import Future
+from qwrapper.measurement import MeasurementMethod
 
 
 class TestFuture(TestCase):
@@ -63,6 +64,20 @@ class TestPauliObservable(TestCase):
 
         self.assertAlmostEquals(h1.exact_value(qc1), h1.exact_value(qc2))
 
+    def test_exact_value_qiskit(self):
+        qc1 = init_circuit(4, "qulacs")
+        qc2 = init_circuit(4, "qiskit")
+        for qc in [qc1, qc2]:
+            qc.h(0)
+            qc.ry(0.3, 1)
+            qc.cnot(0, 2)
+            qc.rx(0.5, 3)
+            qc.cnot(3, 1)
+        for p_string in ["XIXI", "YZYX", "IZIY", "ZIII", "IYXZ"]:
+            for sign in [1, -1]:
+                obs = PauliObservable(p_string, sign)
+                self.assertAlmostEqual(obs.exact_value(qc1), obs.exact_value(qc2))
+
 
 class TestHamiltonian(TestCase):
     def test_gen_ancilla_hamiltonian(self):
@@ -74,3 +89,41 @@ class TestHamiltonian(TestCase):
         self.assertEquals(h1.hs[1], 0.7)
         self.assertEquals(h1.paulis[0].p_string, "IIZX")
         self.assertEquals(h1.paulis[1].p_string, "ZZYX")
+
+    def test_set_hs(self):
+        qc = init_circuit(3, "qulacs")
+        qc.h(0)
+        qc.rx(0.7, 1)
+        qc.ry(0.5, 2)
+        paulis = [PauliObservable("IIZ", sign=-1), PauliObservable("ZZY"), PauliObservable("XIX")]
+        h = Hamiltonian([0.5, 0.7, 0.1], paulis, 3)
+        h.exact_value(qc)
+        h.set_hs([0.2, 0.3, 0.9])
+        self.assertAlmostEqual(Hamiltonian([0.2, 0.3, 0.9], paulis, 3).exact_value(qc), h.exact_value(qc))
+
+    def test_term_values(self):
+        for tool in ["qulacs", "qiskit"]:
+            qc = init_circuit(3, tool)
+            qc.h(0)
+            qc.rx(0.7, 1)
+            qc.ry(0.5, 2)
+            qc.cnot(0, 2)
+            paulis = [PauliObservable("IIZ", sign=-1), PauliObservable("ZZY"), PauliObservable("XIX")]
+            h = Hamiltonian([0.5, 0.7, 0.1], paulis, 3, identity=0.2)
+            values = h.term_values(qc)
+            for p, value in zip(paulis, values):
+                self.assertAlmostEqual(p.exact_value(qc), value)
+            self.assertAlmostEqual(h.exact_value(qc), h.reweight(values))
+            self.assertAlmostEqual(Hamiltonian([0.2, 0.3, 0.9], paulis, 3, identity=0.2).exact_value(qc),
+                                   h.reweight(values, [0.2, 0.3, 0.9]))
+
+    def test_term_values_post_select(self):
+        for tool in ["qulacs", "qiskit"]:
+            qc = init_circuit(2, tool)
+            qc.h(0)
+            qc.cnot(0, 1)
+            qc.post_select(0, 1)
+            h = Hamiltonian([0.5, 0.3], [PauliObservable("ZI"), PauliObservable("IZ")], 2)
+            self.assertAlmostEqual(0.0, h.exact_value(qc))
+            self.assertAlmostEqual(h.exact_value(qc), h.reweight(h.term_values(qc)))
+            self.assertAlmostEqual(h.exact_value(qc), MeasurementMethod(h).exact_value(lambda: qc))
@@ -1,7 +1,7 @@
 from unittest import TestCase
 from qwrapper.obs import PauliObservable
 from qwrapper.operator import ControllablePauli, PauliTimeEvolution
-from qwrapper.circuit import init_circuit
+from qwrapper.circuit import init_circuit, Parameter
 
 
 class TestControllablePauli(TestCase):
@@ -38,4 +38,22 @@ class TestControllablePauli(TestCase):
         for _ in range(1000):
             evolution.add_circuit(qc)
         print(obs.get_value(qc, 0))
-        print(time.time() - start)
\ No newline at end of file
+        print(time.time() - start)
+
+    def test_time_evolution_sweep(self):
+        pauli = PauliObservable("ZYX", -1)
+        evolution = PauliTimeEvolution(pauli, 0.3)
+        qc = init_circuit(3, "qulacs-parametric")
+        qc.h(0)
+        PauliTimeEvolution(pauli, Parameter(0)).add_circuit(qc)
+        obs = PauliObservable("XII")
+        for t in [0.1, 0.5, 1.2]:
+            # the cached gate follows t
+            evolution.t = t
+            expected = init_circuit(3, "qulacs")
+            expected.h(0)
+            evolution.add_circuit(expected)
+            # the angle of the parametric circuit is updated in place
+            qc.set_parameters([t])
+            self.assertAlmostEqual(obs.exact_value(expected), obs.exact_value(qc))
+            self.assertNotAlmostEqual(0, obs.exact_value(qc))
@@ -0,0 +1,47 @@
+from unittest import TestCase
+from qwrapper.pauli import PauliString
+import numpy as np
+
+_MATRICES = {"I": np.eye(2), "X": np.array([[0, 1], [1, 0]]),
+             "Y": np.array([[0, -1j], [1j, 0]]), "Z": np.diag([1, -1])}
+
+
+def to_matrix(p_string):
+    result = np.eye(1)
+    for c in p_string:
+        result = np.kron(_MATRICES[c], result)
+    return result
+
+
+class TestPauliString(TestCase):
+    def test_from_str(self):
+        pauli = PauliString.from_str("XIZY")
+        self.assertEqual(0b1001, pauli.x)
+        self.assertEqual(0b1100, pauli.z)
+        self.assertEqual("XIZY", pauli.to_str())
+        self.assertEqual([0, 2, 3], pauli.support())
+        self.assertEqual([1, 3, 2], pauli.pauli_ids())
+        self.assertEqual(3, pauli.weight)
+        self.assertEqual("X 0 Z 2 Y 3", pauli.to_operator_str())
+        self.assertEqual(PauliString.from_str("XIZY"), pauli)
+        self.assertEqual(1, len({pauli, PauliString.from_str("XIZY")}))
+
+    def test_commutes(self):
+        p_strings = ["XIZY", "ZZII", "YXZI", "IIYY", "XXXX"]
+        for p1 in p_strings:
+            for p2 in p_strings:
+                m1 = to_matrix(p1)
+                m2 = to_matrix(p2)
+                self.assertEqual(np.allclose(m1 @ m2, m2 @ m1),
+                                 PauliString.from_str(p1).commutes(PauliString.from_str(p2)))
+
+    def test_multiply(self):
+        p_strings = ["XIZY", "ZZII", "YXZI", "IIYY", "YYYY"]
+        for p1 in p_strings:
+            for p2 in p_strings:
+                phase, pauli = PauliString.from_str(p1).multiply(PauliString.from_str(p2))
+                self.assertTrue(np.allclose(to_matrix(p1) @ to_matrix(p2), phase * to_matrix(pauli.to_str())))
+
+    def test_tensor(self):
+        pauli = PauliString.from_str("XY").tensor(PauliString.from_str("IZ"))
+        self.assertEqual("XYIZ", pauli.to_str())
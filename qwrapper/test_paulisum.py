@@ -0,0 +1,109 @@
+from unittest import TestCase
+import os, tempfile
+from qwrapper.obs import Hamiltonian, PauliObservable, StreamingHamiltonian
+from qwrapper.circuit import init_circuit
+from qwrapper.paulisum import PauliSum
+from qwrapper.pauli import PauliString
+from qwrapper.hamiltonian import to_matrix_hamiltonian, HeisenbergModel
+from qwrapper.operator import ControllableOperator
+import numpy as np
+
+
+class TestPauliSum(TestCase):
+    def test_from_paulis(self):
+        table = PauliSum.from_paulis([0.5, 0.2], [PauliObservable("XIZ"), PauliObservable("YYI", -1)], 3)
+        self.assertEqual(2, table.nterms)
+        self.assertEqual(1, table.nwords)
+        self.assertEqual("XIZ", table.pauli(0).to_str())
+        self.assertEqual("YYI", table.pauli(1).to_str())
+        self.assertTrue(np.allclose([0.5, -0.2], table.signed_coeffs()))
+
+    def test_wide(self):
+        p_string = "X" + "I" * 68 + "Y" + "Z"
+        table = PauliSum.from_paulis([1.0], [p_string], len(p_string))
+        self.assertEqual(2, table.nwords)
+        self.assertEqual(p_string, table.pauli(0).to_str())
+        self.assertEqual(p_string + "IX", table.tensor(PauliString.from_str("IX")).pauli(0).to_str())
+
+    def test_simplify(self):
+        table = PauliSum.from_paulis([0.5, 0.2, 0.3, 0.1, 0.1],
+                                     ["ZZ", "XI", PauliObservable("ZZ", -1), "IY", PauliObservable("IY", -1)], 2)
+        simplified = table.simplify()
+        self.assertEqual(["ZZ", "XI"], [p.to_str() for p in simplified.paulis()])
+        self.assertTrue(np.allclose([0.2, 0.2], simplified.signed_coeffs()))
+        self.assertEqual(["ZZ", "XI", "ZZ"], [p.to_str() for p in table.drop_small(0.15).paulis()])
+
+    def test_hamiltonian(self):
+        h1 = Hamiltonian([0.5, 0.7], [PauliObservable("XZI"), PauliObservable("IYY", -1)], 3, identity=0.1)
+        h2 = Hamiltonian([0.3], [PauliObservable("XZI")], 3)
+        expected = 2 * to_matrix_hamiltonian(h1) + to_matrix_hamiltonian(h2)
+        h = (2 * h1 + h2).simplify()
+        self.assertEqual(2, len(h.paulis))
+        self.assertTrue(np.allclose(expected, to_matrix_hamiltonian(h)))
+
+    def test_binary(self):
+        hamiltonian = Hamiltonian([0.5, 0.7, 0.2], [PauliObservable("XZI"), PauliObservable("IYY", -1),
+                                                    PauliObservable("ZZZ")], 3, identity=0.1)
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ["h.bin", "h.npz", "h.txt"]:
+                path = os.path.join(directory, name)
+                if name.endswith(".txt"):
+                    hamiltonian.save(path)
+                    loaded = Hamiltonian.load(path)
+                    identity = 0
+                else:
+                    hamiltonian.save_binary(path)
+                    loaded = Hamiltonian.load_binary(path)
+                    identity = 0.1
+                self.assertEqual(["XZI", "IYY", "ZZZ"], [p.p_string for p in loaded.paulis])
+                self.assertEqual([1, -1, 1], [p.sign for p in loaded.paulis])
+                self.assertTrue(np.allclose(to_matrix_hamiltonian(hamiltonian) - 0.1 * np.eye(8) + identity * np.eye(8),
+                                            to_matrix_hamiltonian(loaded)))
+
+    def test_streaming(self):
+        paulis = [PauliObservable("XZI"), PauliObservable("IYY", -1), PauliObservable("ZZZ"),
+                  PauliObservable("XXI"), PauliObservable("IZY", -1)]
+        hamiltonian = Hamiltonian([0.5, 0.7, 0.2, 0.3, 0.4], paulis, 3, identity=0.1)
+        qc = init_circuit(3, "qulacs")
+        qc.h(0)
+        qc.ry(0.3, 1)
+        qc.cx(1, 2)
+        qc.rx(0.2, 2)
+        expected = hamiltonian.exact_value(qc)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "h.bin")
+            hamiltonian.save_binary(path)
+            streaming = StreamingHamiltonian(path, chunk_size=2)
+            self.assertEqual([2, 2, 1], [chunk.nterms for chunk in streaming.chunks()])
+            self.assertAlmostEqual(expected, streaming.exact_value(qc))
+            self.assertAlmostEqual(expected, streaming.get_value(qc, 200000), delta=0.05)
+            path = os.path.join(directory, "h.txt")
+            hamiltonian.save(path)
+            streaming = StreamingHamiltonian(path, chunk_size=3, identity=0.1)
+            self.assertAlmostEqual(expected, streaming.exact_value(qc))
+
+    def test_paulis(self):
+        paulis = [PauliObservable("XZI"), PauliObservable("IYY", -1)]
+        hamiltonian = Hamiltonian([0.5, 0.7], paulis, 3)
+        self.assertIs(paulis, hamiltonian.paulis)
+        self.assertTrue(all(isinstance(p, ControllableOperator) for p in HeisenbergModel(3).paulis))
+        # built from the table when requested
+        hamiltonian = Hamiltonian.from_pauli_sum(hamiltonian.pauli_sum)
+        self.assertIsNone(hamiltonian._paulis)
+        self.assertEqual(["XZI", "IYY"], [p.p_string for p in hamiltonian.paulis])
+        self.assertEqual([1, -1], [p.sign for p in hamiltonian.paulis])
+        self.assertIs(hamiltonian.pauli_sum.paulis(), hamiltonian.pauli_sum.paulis())
+        with self.assertRaises(AttributeError):
+            Hamiltonian([1.0], [PauliObservable("XZZ")], 2)
+
+    def test_complex(self):
+        hamiltonian = Hamiltonian([0.5, 0.2j], [PauliObservable("XZ"), PauliObservable("ZZ", -1)], 2)
+        self.assertEqual(np.complex128, hamiltonian.hs.dtype)
+        self.assertAlmostEqual(0.5 + 0.2j, hamiltonian.lam())
+        expected = 0.5 * PauliObservable("XZ").to_matrix() - 0.2j * PauliObservable("ZZ").to_matrix()
+        self.assertTrue(np.allclose(expected, to_matrix_hamiltonian(hamiltonian)))
+        self.assertTrue(np.allclose(2 * expected, to_matrix_hamiltonian((hamiltonian + hamiltonian).simplify())))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "h.bin")
+            hamiltonian.save_binary(path)
+            self.assertTrue(np.allclose(expected, to_matrix_hamiltonian(Hamiltonian.load_binary(path))))
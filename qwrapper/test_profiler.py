@@ -0,0 +1,76 @@
+from unittest import TestCase
+from qwrapper import profiler
+from qwrapper.obs import Hamiltonian, PauliObservable
+from qwrapper.circuit import init_circuit
+
+
+class Recorder(profiler.Monitor):
+    def __init__(self):
+        self.phases = []
+
+    def on_phase(self, phase, owner, elapsed):
+        self.phases.append((phase, owner))
+
+
+def build(tool):
+    qc = init_circuit(2, tool)
+    qc.h(0)
+    qc.cnot(0, 1)
+    qc.rx(0.3, 1)
+    return qc
+
+
+class TestProfiler(TestCase):
+    def test_profile(self):
+        hamiltonian = Hamiltonian([0.5, 0.2], [PauliObservable("ZZ"), PauliObservable("XI")], 2)
+        with profiler.profile() as p:
+            qc = build("qulacs")
+            hamiltonian.exact_value(qc)
+            qc.get_samples(100)
+            build("qiskit").get_raw_samples(50)
+        report = p.report()
+        phases = {(entry["phase"], entry["owner"]): entry["calls"] for entry in report["phases"]}
+        self.assertEqual(1, phases[("exact_value", "Hamiltonian")])
+        self.assertEqual(1, phases[("build_observable", "Hamiltonian")])
+        # the state is simulated once and reused by the sampling
+        self.assertEqual(1, phases[("simulate", "QulacsCircuit")])
+        self.assertEqual(1, phases[("sample", "QiskitCircuit")])
+        self.assertEqual(150, report["counts"]["shots"])
+        self.assertEqual(1, report["counts"]["gate.CNOT"])
+        self.assertEqual(1, report["counts"]["gate.cx"])
+        # the exact value and the sampling read the memoized state without copying it
+        self.assertNotIn("state_copies", report["counts"])
+        self.assertEqual(1, report["counts"]["memo_hits"])
+        self.assertIn("simulate", p.summary())
+
+        # nothing is recorded after the block
+        build("qulacs").get_state()
+        self.assertEqual(report, p.report())
+        self.assertFalse(profiler.enabled())
+
+    def test_monitor(self):
+        recorder = Recorder()
+        profiler.add_monitor(recorder)
+        try:
+            build("qulacs").get_state_vector()
+        finally:
+            profiler.remove_monitor(recorder)
+        self.assertEqual([("simulate", "QulacsCircuit"), ("get_state_vector", "QulacsCircuit")], recorder.phases)
+
+    def test_state_copies(self):
+        with profiler.profile() as p:
+            qc = build("qulacs")
+            qc.set_ref_state([0, 1, 0, 0])
+            qc.checkpoint()
+            qc.ry(0.2, 0)
+            qc.get_state_vector()
+        # the reference state, the checkpoint and its restore
+        self.assertEqual(3, p.report()["counts"]["state_copies"])
+
+        recorder = Recorder()
+        profiler.add_monitor(recorder)
+        try:
+            build("qiskit").get_state_vector()
+        finally:
+            profiler.remove_monitor(recorder)
+        self.assertEqual([("simulate", "QiskitCircuit"), ("get_state_vector", "QiskitCircuit")], recorder.phases)
@@ -0,0 +1,47 @@
+from unittest import TestCase
+from qwrapper.obs import Hamiltonian, PauliObservable
+from qwrapper.qdrift import QDrift
+from qwrapper.trotter import add_rotations
+from qwrapper.executor import ProcessExecutor
+from qwrapper.hamiltonian import to_matrix_hamiltonian
+from qwrapper.circuit import init_circuit
+from scipy.linalg import expm
+import numpy as np
+
+OBS = PauliObservable("ZZI")
+
+
+def energy(sequence):
+    qc = init_circuit(3, "qulacs")
+    qc.h(0)
+    add_rotations(qc, sequence)
+    return OBS.exact_value(qc)
+
+
+class TestQDrift(TestCase):
+    def setUp(self):
+        self.hamiltonian = Hamiltonian([0.5, 0.7, 0.3],
+                                       [PauliObservable("XXI"), PauliObservable("IZZ", -1), PauliObservable("YIY")], 3)
+
+    def test_sequence(self):
+        qdrift = QDrift(self.hamiltonian, 0.4, 50, seed=1)
+        sequence = qdrift.sample_sequence()
+        self.assertLess(len(sequence), 50)
+        self.assertAlmostEqual(50 * qdrift.tau, sum(abs(theta) for _, theta in sequence))
+        for (p1, _), (p2, _) in zip(sequence[:-1], sequence[1:]):
+            self.assertNotEqual(p1, p2)
+
+    def test_evolve(self):
+        qdrift = QDrift(self.hamiltonian, 0.4, 100, seed=1)
+        sequence = qdrift.sample_sequence()
+        qc = init_circuit(3, "qulacs")
+        qdrift.add_circuit(qc, sequence)
+        self.assertAlmostEqual(1, abs(np.vdot(qdrift.evolve(np.eye(8)[0], sequence), qc.get_state_vector())))
+
+        # the average over the random circuits approximates the exact evolution
+        plus = np.kron(np.eye(4)[0], np.ones(2) / np.sqrt(2))
+        vector = expm(-1j * 0.4 * to_matrix_hamiltonian(self.hamiltonian)) @ plus
+        expected = np.vdot(vector, OBS.to_matrix() @ vector).real
+        with ProcessExecutor(2) as executor:
+            values = qdrift.map(energy, 200, executor)
+        self.assertAlmostEqual(expected, np.mean(values), delta=0.05)
@@ -0,0 +1,35 @@
+from unittest import TestCase
+from qwrapper.sampler import AliasImportantSampler
+import numpy as np
+
+
+class TestAliasImportantSampler(TestCase):
+    def test_sample_indices(self):
+        coeffs = np.array([0.5, 0.1, 2.0, 0.0, 1.4])
+        sampler = AliasImportantSampler(coeffs, seed=1)
+        counts = np.bincount(sampler.sample_indices(200000), minlength=len(coeffs))
+        np.testing.assert_allclose(coeffs / np.sum(coeffs), counts / 200000, atol=0.005)
+        self.assertEqual(0, counts[3])
+
+        self.assertEqual(list(AliasImportantSampler(coeffs, seed=3).sample_indices(100)),
+                         list(AliasImportantSampler(coeffs, seed=3).sample_indices(100)))
+        self.assertIn(sampler.sample_index(), [0, 1, 2, 4])
+
+    def test_update(self):
+        sampler = AliasImportantSampler([1.0, 1.0, 1.0], seed=1)
+        sampler.update([0, 2], [0.0, 3.0])
+        counts = np.bincount(sampler.sample_indices(100000), minlength=3)
+        np.testing.assert_allclose([0, 0.25, 0.75], counts / 100000, atol=0.01)
+
+    def test_invalid(self):
+        for coeffs in [[0.5, -0.1], [0.5, np.nan], [0.5, np.inf]]:
+            with self.assertRaises(ValueError):
+                AliasImportantSampler(coeffs)
+        sampler = AliasImportantSampler([1.0, 0.0])
+        with self.assertRaises(ValueError):
+            sampler.update([0], [-1.0])
+        sampler.update([0], [0.0])
+        with self.assertRaises(ValueError):
+            sampler.sample_indices(10)
+        with self.assertRaises(ValueError):
+            AliasImportantSampler([0.0, 0.0]).sample_index()
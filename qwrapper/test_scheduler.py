@@ -0,0 +1,55 @@
+from unittest import TestCase
+from qwrapper.circuit import init_circuit
+from qwrapper.scheduler import JobScheduler, gather, gather_async
+import asyncio
+import threading
+
+
+class TestScheduler(TestCase):
+    def test_get_async_samples(self):
+        futures = []
+        for tool in ["qulacs", "qiskit"]:
+            qc = init_circuit(2, tool)
+            qc.x(1)
+            futures.append(qc.get_async_samples(10))
+            # the circuit can be modified after the submission
+            qc.x(0)
+        for future in futures:
+            for sample in future.get():
+                self.assertEqual([1, 0], [int(b) for b in sample])
+
+    def test_callback_and_cancel(self):
+        scheduler = JobScheduler(max_workers=1, max_pending=2)
+        event = threading.Event()
+        blocker = scheduler.submit(event.wait)
+        pending = scheduler.submit(abs, -1)
+        self.assertTrue(pending.cancel())
+        self.assertTrue(pending.cancelled())
+        event.set()
+        results = []
+        future = scheduler.submit(abs, -3)
+        future.add_done_callback(lambda f: results.append(f.result()))
+        self.assertEqual([True, 3], gather([blocker, future]))
+        self.assertEqual([3], results)
+        scheduler.shutdown()
+
+    def test_asyncio(self):
+        qc = init_circuit(2, "qulacs")
+        qc.x(0)
+
+        async def run():
+            single = await qc.get_async_samples(3)
+            many = await gather_async([qc.get_async_samples(3) for _ in range(5)])
+            return single, many
+
+        single, many = asyncio.run(run())
+        self.assertEqual([[0, 1]] * 3, single)
+        self.assertEqual([[[0, 1]] * 3] * 5, many)
+
+    def test_factor(self):
+        scheduler = JobScheduler(max_workers=1)
+        future = scheduler.submit(abs, -3)
+        future * 2
+        self.assertEqual(6, future.get())
+        self.assertEqual(3, future.result())
+        scheduler.shutdown()
@@ -0,0 +1,46 @@
+from unittest import TestCase
+from qwrapper.obs import Hamiltonian, PauliObservable
+from qwrapper.trotter import Trotter, product_formula
+from qwrapper.hamiltonian import to_matrix_hamiltonian
+from qwrapper.circuit import init_circuit
+from scipy.linalg import expm
+import numpy as np
+
+
+class TestTrotter(TestCase):
+    def setUp(self):
+        self.hamiltonian = Hamiltonian([0.5, 0.7, 0.3, 0.4, 0.2],
+                                       [PauliObservable("XXI"), PauliObservable("IZZ", -1), PauliObservable("YIY"),
+                                        PauliObservable("ZII"), PauliObservable("XXI")], 3)
+        self.expected = expm(-1j * 0.8 * to_matrix_hamiltonian(self.hamiltonian))[:, 0]
+
+    def test_product_formula(self):
+        for order in [1, 2, 4, 6]:
+            fractions = np.zeros(3)
+            for k, f in product_formula(3, order):
+                fractions[k] += f
+            self.assertTrue(np.allclose(np.ones(3), fractions))
+
+    def test_sequence(self):
+        # XXI appears twice in the Hamiltonian
+        self.assertEqual(4, len(Trotter(self.hamiltonian, 0.8).sequence()))
+        # the last rotation of a step is merged with the first one of the next step
+        self.assertEqual(3 * 6 + 1, len(Trotter(self.hamiltonian, 0.8, nsteps=3, order=2).sequence()))
+
+    def test_evolve(self):
+        errors = []
+        for order in [1, 2, 4]:
+            trotter = Trotter(self.hamiltonian, 0.8, nsteps=4, order=order)
+            vector = trotter.evolve(np.eye(8)[0])
+            errors.append(np.linalg.norm(vector - self.expected))
+        self.assertTrue(errors[0] > errors[1] > errors[2])
+        self.assertLess(errors[2], 1e-4)
+
+    def test_add_circuit(self):
+        trotter = Trotter(self.hamiltonian, 0.8, nsteps=3, order=2)
+        vector = trotter.evolve(np.eye(8)[0])
+        for tool in ["qulacs", "qiskit"]:
+            qc = init_circuit(3, tool)
+            trotter.add_circuit(qc)
+            state = qc.get_state_vector()
+            self.assertAlmostEqual(1, abs(np.vdot(vector, state)))
@@ -0,0 +1,120 @@
+from qwrapper.circuit import QWrapper, QulacsCircuit
+from qwrapper.obs import Hamiltonian, PauliObservable
+from qwrapper.operator import PauliTimeEvolution, rotation_gate
+from qwrapper.grouping import GreedyGrouping
+from qwrapper.sparse import pauli_phases
+import numpy as np
+
+
+def product_formula(nterms, order):
+    """
+    :param order: 1, or an even number for the Suzuki formula of the order (2 is the symmetric Strang splitting)
+    :return list of (term index, fraction of the time step) of a single step:
+    """
+    if order == 1:
+        return [(k, 1.0) for k in range(nterms)]
+    if order == 2:
+        half = [(k, 0.5) for k in range(nterms)]
+        return _merge_indices(half + half[::-1])
+    if order % 2 != 0 or order < 1:
+        raise AttributeError(f'order {order} is not supported.')
+    p = 1 / (4 - 4 ** (1 / (order - 1)))
+    outer = [(k, p * f) for k, f in product_formula(nterms, order - 2)]
+    inner = [(k, (1 - 4 * p) * f) for k, f in product_formula(nterms, order - 2)]
+    return _merge_indices(outer + outer + inner + outer + outer)
+
+
+def _merge_indices(sequence):
+    results = []
+    for k, f in sequence:
+        if len(results) != 0 and results[-1][0] == k:
+            results[-1] = (k, results[-1][1] + f)
+        else:
+            results.append((k, f))
+    return results
+
+
+def add_rotations(qc: QWrapper, sequence):
+    """
+    :param sequence: list of (PauliString, theta) standing for the product of exp(-i theta P) from the first
+    """
+    # the identity terms only contribute to the global phase
+    sequence = [(pauli, theta) for pauli, theta in sequence if pauli.weight != 0]
+    if isinstance(qc, QulacsCircuit):
+        for pauli, theta in sequence:
+            qc.add_gate(rotation_gate(pauli, -2 * theta))
+        return
+    for pauli, theta in sequence:
+        PauliTimeEvolution(PauliObservable(pauli), -theta, cachable=False).add_circuit(qc)
+
+
+def evolve_vector(vector, sequence):
+    """
+    Apply the product of exp(-i theta P) = cos(theta) - i sin(theta) P to the state vector without building gates.
+
+    :param vector: state vector whose j-th bit of the index corresponds to j-th qubit
+    :param sequence: list of (PauliString, theta)
+    :return the evolved state vector:
+    """
+    vector = np.array(vector, dtype=np.complex128).reshape(-1)
+    indices = np.arange(len(vector), dtype=np.uint64)
+    buffer = np.empty_like(vector)
+    for pauli, theta in sequence:
+        # (P v)[i] = p(i ^ x) v[i ^ x]
+        flipped = indices ^ np.uint64(pauli.x)
+        np.multiply(pauli_phases(pauli.z, pauli.n_y, flipped), vector[flipped], out=buffer)
+        vector *= np.cos(theta)
+        buffer *= -1j * np.sin(theta)
+        vector += buffer
+    return vector
+
+
+class Trotter:
+    """
+    Product formula approximating exp(-i H t) with nsteps steps. Duplicated Pauli strings of H are merged,
+    and the rotations of the same Pauli string which become adjacent (e.g. at the boundaries of the steps)
+    are merged into a single rotation.
+    """
+
+    def __init__(self, hamiltonian: Hamiltonian, t, nsteps=1, order=1, reorder=True):
+        """
+        :param reorder: put the qubit-wise-commuting terms next to each other, which does not change the
+                        error within a group and lets the adjacent rotations be fused
+        """
+        self.hamiltonian = hamiltonian
+        self.t = t
+        self.nsteps = nsteps
+        self.order = order
+        self.reorder = reorder
+        self._sequence = None
+
+    def sequence(self):
+        """
+        :return list of (PauliString, theta) standing for the product of exp(-i theta P) from the first:
+        """
+        if self._sequence is None:
+            self._sequence = self._build_sequence()
+        return self._sequence
+
+    def _build_sequence(self):
+        table = self.hamiltonian.pauli_sum.simplify()
+        paulis = table.paulis()
+        coeffs = table.signed_coeffs()
+        order = list(range(len(paulis)))
+        if self.reorder:
+            order = [index for group in GreedyGrouping().group(paulis) for index in group.indices]
+        dt = self.t / self.nsteps
+        step = [(order[k], f) for k, f in product_formula(len(order), self.order)]
+        return [(paulis[k], float(coeffs[k] * f * dt)) for k, f in _merge_indices(step * self.nsteps)]
+
+    def add_circuit(self, qc: QWrapper):
+        add_rotations(qc, self.sequence())
+
+    def evolve(self, vector):
+        """
+        Apply the product formula to the state vector without building gates.
+
+        :param vector: state vector whose j-th bit of the index corresponds to j-th qubit
+        :return the evolved state vector:
+        """
+        return evolve_vector(vector, self.sequence())
@@ -1,4 +1,4 @@
-from qwrapper.encoder import Encoder
+import numpy as np
 
 
 class QUtil:
@@ -21,15 +21,54 @@ class QUtil:
                 r = r * -1
         return r
 
+    @classmethod
+    def parities(cls, samples, excludes: set = None):
+        """
+        :param samples: either (nshot x n_qubit) bit matrix obtained by get_samples of QWrapper
+                        or integer array whose j-th bit corresponds to j-th qubit
+        :param excludes: (qubits indices excluded from the computation of the parity)
+        :return parities: integer array of +1/-1 for each sample
+        """
+        samples = np.asarray(samples)
+        if samples.ndim == 2:
+            n_qubit = samples.shape[1]
+            columns = [cls.get_index(q_index, n_qubit) for q_index in range(n_qubit)
+                       if excludes is None or q_index not in excludes]
+            bits = np.sum(samples[:, columns], axis=1, dtype=np.int64) & 1
+        else:
+            if samples.dtype.kind in "US":
+                samples = np.array([int(s, 2) for s in samples], dtype=np.uint64)
+            samples = samples.astype(np.uint64, copy=False)
+            bits = cls.bit_parity(samples & np.uint64(cls.mask(64, excludes)))
+        return 1 - 2 * bits.astype(np.int64)
+
     @classmethod
     def exp_parity(cls, state_vector, nqubit, excludes: set = None):
-        if excludes is None:
-            excludes = {}
-        encoder = Encoder(nqubit)
+        probs = np.abs(np.asarray(state_vector)) ** 2
+        indices = np.arange(len(probs), dtype=np.uint64)
+        bits = cls.bit_parity(indices & np.uint64(cls.mask(nqubit, excludes)))
+        return np.sum(probs[bits == 0]) - np.sum(probs[bits == 1])
+
+    @classmethod
+    def bit_parity(cls, values):
+        """
+        :param values: unsigned integer array
+        :return the parity (0 or 1) of the number of bits set in each value:
+        """
+        values = np.array(values, dtype=np.uint64)
+        for shift in (32, 16, 8, 4, 2, 1):
+            values ^= values >> np.uint64(shift)
+        return values & np.uint64(1)
+
+    @classmethod
+    def mask(cls, nqubit, excludes: set = None):
+        """
+        :return integer whose j-th bit is set when j-th qubit is included in the parity:
+        """
         result = 0
-        for i, s in enumerate(state_vector):
-            parity = cls.parity(encoder.encode(i), excludes)
-            result = result + parity * pow(abs(s), 2)
+        for q_index in range(nqubit):
+            if excludes is None or q_index not in excludes:
+                result |= 1 << q_index
         return result
 
     @classmethod
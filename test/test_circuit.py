@@ -32,3 +32,19 @@ class TestCircuit(unittest.TestCase):
         qc2.cnot(1, 3)
         qc2.ry(0.5, 3)
         print(qc2.get_counts(100))
+
+    def test_raw_samples(self):
+        for tool in ["qiskit", "qulacs"]:
+            qc = init_circuit(3, tool)
+            qc.x(0)
+            qc.h(2)
+            samples = qc.get_raw_samples(100)
+            self.assertEqual(100, len(samples))
+            for value in samples.raw:
+                self.assertIn(value, {1, 5})
+            counts = samples.counts()
+            self.assertEqual(100, sum(counts.values()))
+            self.assertTrue(set(counts.keys()).issubset({"001", "101"}))
+            self.assertIn(samples.bitstrings()[0], {"001", "101"})
+            self.assertIn(samples[0], [[0, 0, 1], [1, 0, 1]])
+            np.testing.assert_array_equal(samples.bit_matrix(), np.array(samples.bit_lists()))
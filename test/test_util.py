@@ -22,3 +22,9 @@ class TestQUtil(TestCase):
         qc.h(0)
         for s in qc.get_samples(4):
             self.assertEquals(QUtil.parity(s, {0}), 1)
+
+    def test_parities(self):
+        samples = [[0, 1, 1], [1, 1, 0], [0, 0, 1]]
+        self.assertEqual([QUtil.parity(s, {1}) for s in samples], list(QUtil.parities(samples, {1})))
+        self.assertEqual([1, 1, -1], list(QUtil.parities([3, 6, 1])))
+        self.assertEqual([-1, -1, -1], list(QUtil.parities([3, 6, 1], {1})))